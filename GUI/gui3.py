@@ -1,13 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
+import importlib
+import threading
 import json
 import os
+import time
 import subprocess
 import sys
-import urllib.request
-import webbrowser
 import io
+import itertools
 
 # ✅ Add NEWSAPP root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -18,22 +19,61 @@ try:
 except ImportError:
     ThemedStyle = None
 
-# ✅ Import the detailed scrapers
-from modules.economictimes.scrape_et_detail_by_index import scrape_single_et_article
-from modules.thehindu.scrape_th_detail_by_index import scrape_single_th_article
-from modules.indianexpress.scrape_ie_detail_by_index import scrape_single_ie_article
-from modules.timesofindia.scrape_toi_detail_by_index import scrape_single_toi_article
+from GUI.logo_cache import cached_logo
+
+# ✅ Detailed scrapers, imported on first use (they pull in bs4 and requests)
+DETAIL_SCRAPERS = {
+    "The Economic Times": ("modules.economictimes.scrape_et_detail_by_index", "scrape_single_et_article"),
+    "The Hindu": ("modules.thehindu.scrape_th_detail_by_index", "scrape_single_th_article"),
+    "The Indian Express": ("modules.indianexpress.scrape_ie_detail_by_index", "scrape_single_ie_article"),
+    "Times of India": ("modules.timesofindia.scrape_toi_detail_by_index", "scrape_single_toi_article"),
+}
+
+
+# Stories added to the "All papers" timeline each time the list is scrolled to its end
+TIMELINE_PAGE = 30
+
+# A headline the pointer rests on this long (ms) is prefetched; one it only crosses is not
+PREFETCH_HOVER_MS = 150
+# The top of a headline list is prefetched once the list has rendered and this long (ms) has passed
+PREFETCH_IDLE_MS = 400
+# How often (ms) a click on a paper still being refreshed in the background checks on it
+REFRESH_POLL_MS = 200
+
+
+def load_detail_scraper(newspaper):
+    module_name, func_name = DETAIL_SCRAPERS[newspaper]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def find_story(data, news_url, headline=None):
+    # The stored story a headline button stands for. Looked up by News URL: a
+    # prefetch or a click may have replaced the headline with the article's own,
+    # and a refresh may have renumbered the list. By headline only without a URL.
+    for item in data:
+        if news_url and item.get("News URL") == news_url:
+            return item
+        if not news_url and (item.get("Headline") or "No Title") == headline:
+            return item
+    return None
 
 
 class NewsApp:
-    def __init__(self, root):
+    def __init__(self, root, fast_start=False):
         # Configure the root window for fade effect
         self.root = root
+        self.fast_start = fast_start or os.environ.get("NEWSAPP_FAST_START") == "1"
         self.root.withdraw()
         self.fade_alpha = 0.0
         self.root.attributes("-alpha", self.fade_alpha)
         self.root.deiconify()
         self.root.title("The News App")
+        # Background article fetches of each open headline list, by newspaper
+        self.prefetchers = {}
+        # Stored stories of every paper, re-read only when a file changes (related articles)
+        self.story_store = None
+        # Newspaper -> time.monotonic() after which a click stops waiting for its background refresh
+        self.refresh_waits = {}
 
         # Apply modern theme if available
         if ThemedStyle:
@@ -43,11 +83,15 @@ class NewsApp:
             self.style = ttk.Style(self.root)
             self.style.theme_use("clam")
 
-        # Start the welcome screen
-        self.show_welcome_screen()
+        # Start the welcome screen, or go straight to the newspapers
+        if self.fast_start:
+            self.start_main_app()
+        else:
+            self.show_welcome_screen()
 
     def show_welcome_screen(self):
-        # Create and display welcome screen
+        # Create and display welcome screen; the network warm-up runs meanwhile
+        self.start_warmup()
         self.welcome_frame = tk.Frame(self.root, bg="lightblue")
         self.welcome_frame.pack(expand=True, fill="both")
 
@@ -81,8 +125,11 @@ class NewsApp:
 
     def start_main_app(self):
         # Destroy welcome frame and set up main interface
-        self.root.attributes("-alpha", 0.0)
-        self.welcome_frame.destroy()
+        if self.fast_start:
+            self.root.attributes("-alpha", 1.0)
+        else:
+            self.root.attributes("-alpha", 0.0)
+            self.welcome_frame.destroy()
 
         # Load button images for newspapers
         self.news_images = {
@@ -107,8 +154,77 @@ class NewsApp:
         self.create_slots()
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.fade_alpha = 0.0
-        self.root.after(50, self.fade_in_main)
+        if not self.fast_start:
+            self.fade_alpha = 0.0
+            self.root.after(50, self.fade_in_main)
+
+        # Warm up the scraper imports once the window is usable
+        self.root.after(500, self.preload_detail_scrapers)
+        if self.fast_start:
+            # No welcome screen to hide it behind; start as soon as the window is up
+            self.root.after(500, self.start_warmup)
+
+        if os.environ.get("NEWSAPP_STARTUP_PROBE"):
+            # benchmarks/startup_report.py: say when the window is interactive, then exit
+            self.root.after_idle(self.report_startup)
+
+    def preload_detail_scrapers(self):
+        def worker():
+            for newspaper in DETAIL_SCRAPERS:
+                try:
+                    load_detail_scraper(newspaper)
+                except Exception as e:
+                    print(f"[WARNING] Could not preload {newspaper} scraper: {e}")
+            try:
+                # Read the related-articles index now so the first article opens without the wait
+                from modules.common.related import open_index
+                open_index().refresh()
+            except Exception:
+                pass
+        threading.Thread(target=worker, daemon=True).start()
+
+    def start_warmup(self):
+        # Connect to every paper and image host (and, with NEWSAPP_BACKGROUND_REFRESH=1,
+        # refresh the listings) before the first click asks for them
+        try:
+            from modules.common import warmup
+            warmup.start()
+        except Exception as e:
+            print(f"[WARNING] Could not start the network warm-up: {e}")
+
+    def start_prefetch(self, newspaper):
+        # Fetch the articles this list is likely to open next (modules/common/prefetch.py);
+        # every opening of the list gets a fresh budget
+        previous = self.prefetchers.pop(newspaper, None)
+        if previous:
+            previous.close()
+        try:
+            from modules.common import prefetch
+            from modules.common.warmup import code_for
+            if not prefetch.ENABLED:
+                return None
+            prefetcher = self.prefetchers[newspaper] = prefetch.Prefetcher(code_for(newspaper))
+            return prefetcher
+        except Exception as e:
+            print(f"[WARNING] Could not start prefetching for {newspaper}: {e}")
+            return None
+
+    def bind_hover_prefetch(self, button, prefetcher, position):
+        pending = []
+
+        def enter(event):
+            pending.append(button.after(PREFETCH_HOVER_MS, lambda: prefetcher.hover(position)))
+
+        def leave(event):
+            while pending:
+                button.after_cancel(pending.pop())
+
+        button.bind("<Enter>", enter, add="+")
+        button.bind("<Leave>", leave, add="+")
+
+    def report_startup(self):
+        print("[startup] ready", flush=True)
+        self.on_closing()
 
     def fade_in_main(self):
         # Fade-in animation for main screen
@@ -118,10 +234,9 @@ class NewsApp:
             self.root.after(50, self.fade_in_main)
 
     def load_image(self, path):
-        # Load and resize image for button
+        # Load a pre-resized copy of the button image; Tk decodes PNG itself
         try:
-            img = Image.open(path).resize((400, 400))
-            return ImageTk.PhotoImage(img)
+            return tk.PhotoImage(file=cached_logo(path, (400, 400)))
         except:
             return None
 
@@ -131,6 +246,13 @@ class NewsApp:
         for i, newspaper in enumerate(newspapers):
             self.create_button(newspaper, i)
 
+        # Every paper's stored stories in one list, newest first
+        all_button = ttk.Button(
+            self.container, text="All papers", style="Headline.TButton",
+            command=lambda: self.open_timeline_page(self.root)
+        )
+        all_button.grid(row=2, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="ew")
+
     def create_button(self, newspaper, index):
         # Create a newspaper button with image and label
         image = self.news_images.get(newspaper)
@@ -156,7 +278,7 @@ class NewsApp:
             self.run_scraper_and_open_news(newspaper)
         ])
 
-    def run_scraper_and_open_news(self, newspaper):
+    def run_scraper_and_open_news(self, newspaper, polling=False):
         # Map newspaper to corresponding main.py script
         scraper_map = {
             "The Economic Times": "ETmain.py",
@@ -170,6 +292,24 @@ class NewsApp:
             # fallback: just open news without scraper
             self.open_news_page(newspaper, self.root)
             return
+
+        from modules.common import warmup
+        if newspaper in self.refresh_waits and not polling:
+            # Clicked again while the first click waits; that one opens the list
+            return
+        state = warmup.refresh_state(warmup.code_for(newspaper))
+        if state == "running":
+            # Never crawl a paper twice at once: check back without blocking the window,
+            # and open what is stored if the background refresh takes too long
+            deadline = self.refresh_waits.setdefault(newspaper, time.monotonic() + warmup.REFRESH_WAIT)
+            if time.monotonic() < deadline:
+                self.root.after(REFRESH_POLL_MS, lambda: self.run_scraper_and_open_news(newspaper, polling=True))
+                return
+        self.refresh_waits.pop(newspaper, None)
+        if state is not None:
+            # The background refresh started with the app stored fresh stories, or is still at it
+            self.open_news_page(newspaper, self.root)
+            return
     
         try:
             # Print current working directory and script absolute path for debugging
@@ -275,14 +415,23 @@ class NewsApp:
 
         # === News Buttons inside scrollable frame ===
         news_list = self.load_headlines_from_json(newspaper)
+        prefetcher = self.start_prefetch(newspaper)
     
-        for headline, _ in news_list:
+        for position, (headline, _, news_url) in enumerate(news_list):
             news_button = ttk.Button(
             scrollable_frame, text=headline, style="Headline.TButton",
-            command=lambda h=headline: self.show_description_from_json(newspaper, h, news_window)
+            command=lambda h=headline, u=news_url: self.show_description_from_json(newspaper, u, news_window, h)
         )
 
             news_button.pack(fill="x", padx=10, pady=5)
+            if prefetcher:
+                self.bind_hover_prefetch(news_button, prefetcher, position)
+
+        if prefetcher:
+            # Once the list is drawn and the user is reading it, fetch the top stories;
+            # queued fetches are dropped when the list closes
+            news_window.after_idle(lambda: news_window.after(PREFETCH_IDLE_MS, prefetcher.idle))
+            news_window.bind("<Destroy>", lambda e: e.widget is news_window and prefetcher.close(), add="+")
     
         # === Back Button pinned to bottom ===
         back_button = ttk.Button(
@@ -292,6 +441,78 @@ class NewsApp:
         back_button.pack(side="bottom", fill="x", pady=10)
     
 
+    def stored_stories(self):
+        # One store for the app's lifetime: a paper's JSON is re-read and re-sorted
+        # only when its file changes (mtime and size), not on every timeline or panel
+        from modules.common.store import StoryStore
+        if self.story_store is None:
+            self.story_store = StoryStore()
+        return self.story_store
+
+    def open_timeline_page(self, previous_window):
+        # Stored stories of all four papers, newest first; nothing is scraped here
+        from modules.common.store import SOURCES
+
+        previous_window.withdraw()
+        timeline_window = tk.Toplevel(self.root)
+        timeline_window.title("All papers")
+        timeline_window.geometry("800x600")
+
+        timeline_window.protocol("WM_DELETE_WINDOW", lambda: self.back_to_previous(timeline_window, previous_window))
+        timeline_window.bind("<Escape>", lambda e: self.back_to_previous(timeline_window, previous_window))
+
+        # Back button packed first so it keeps its place at the bottom
+        back_button = ttk.Button(
+            timeline_window, text="Back",
+            command=lambda: self.back_to_previous(timeline_window, previous_window)
+        )
+        back_button.pack(side="bottom", fill="x", pady=10)
+
+        container = ttk.Frame(timeline_window)
+        container.pack(fill="both", expand=True)
+
+        canvas = tk.Canvas(container)
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
+        scrollable_frame = ttk.Frame(canvas)
+
+        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        window_in_canvas = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.bind("<Configure>", lambda e: canvas.itemconfig(window_in_canvas, width=e.width))
+
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self.enable_mousewheel_scrolling(canvas)
+
+        # The merge is lazy: only the stories actually shown are ever compared
+        stories = self.stored_stories().timeline()
+        state = {"exhausted": False}
+
+        def load_page():
+            page = list(itertools.islice(stories, TIMELINE_PAGE))
+            if len(page) < TIMELINE_PAGE:
+                state["exhausted"] = True
+            for source, story in page:
+                newspaper = SOURCES[source]["name"]
+                headline = story.headline or "No Title"
+                label = f"[{source}] {headline}"
+                if story.date_time:
+                    label += f"  \u2014  {story.date_time}"
+                ttk.Button(
+                    scrollable_frame, text=label, style="Headline.TButton",
+                    command=lambda n=newspaper, u=story.news_url, h=headline:
+                        self.show_description_from_json(n, u, timeline_window, h)
+                ).pack(fill="x", padx=10, pady=5)
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            # Near the bottom: append the next page
+            if float(last) >= 0.95 and not state["exhausted"]:
+                load_page()
+
+        canvas.configure(yscrollcommand=on_scroll)
+        load_page()
+
     def load_headlines_from_json(self, newspaper):
         # Map each newspaper to its respective JSON file
         file_map = {
@@ -303,12 +524,15 @@ class NewsApp:
         try:
             with open(file_map[newspaper], 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            return [(item.get("Headline", "No Title"), item.get("Paragraph", "No Description")) for item in data]
+            return [(item.get("Headline") or "No Title", item.get("Paragraph") or "No Description", item.get("News URL"))
+                    for item in data]
         except Exception as e:
-            return [("Error loading headlines", str(e))]
+            return [("Error loading headlines", str(e), None)]
 
 
     def open_news_description(self, title, description, previous_window, image_url=None, datetime_str="", link=None):
+        from PIL import Image, ImageTk
+
         previous_window.withdraw()
 
         description_window = tk.Toplevel(self.root)
@@ -387,6 +611,7 @@ class NewsApp:
                     pil_image = Image.open(local_path)
                 else:
                     # It's a URL
+                    import urllib.request
                     with urllib.request.urlopen(image_url) as u:
                         raw_data = u.read()
                     pil_image = Image.open(io.BytesIO(raw_data))
@@ -455,6 +680,7 @@ class NewsApp:
             link_frame.pack(fill="x", padx=10, pady=(0, 20))
             
             def open_link():
+                import webbrowser
                 webbrowser.open(link)
                 
             link_btn = ttk.Button(
@@ -464,11 +690,41 @@ class NewsApp:
             )
             link_btn.pack(pady=5)
 
+        # === Related articles from all papers ===
+        if link:
+            self.add_related_articles(scrollable, link, f"{title} {description}", description_window)
+
         # === Back Button ===
         back_button = ttk.Button(description_window, text="Back", command=lambda: self.back_to_previous(description_window, previous_window))
         back_button.pack(side="bottom", fill="x", pady=10)
     
-    def show_description_from_json(self, newspaper, headline, previous_window):
+    def add_related_articles(self, parent, link, text, window):
+        # Most similar stored stories across all papers (needs numpy; skipped without it)
+        try:
+            from modules.common.related import related_stories
+            from modules.common.sources import SOURCES
+            # Only stories a paper still holds can be opened from the panel
+            current = {code: {s.news_url: s.headline or "No Title" for s in self.stored_stories().stories(code)}
+                       for code in SOURCES}
+            related = related_stories(link, text, current=current)
+        except ImportError:
+            return
+        except Exception as e:
+            print(f"[WARNING] Could not look up related articles: {e}")
+            return
+        if not related:
+            return
+
+        related_frame = ttk.Frame(parent)
+        related_frame.pack(fill="x", padx=10, pady=(0, 20))
+        ttk.Label(related_frame, text="Related articles", font=("Helvetica", 12, "bold")).pack(anchor="w", pady=(0, 5))
+        for source, news_url, headline, _ in related:
+            ttk.Button(
+                related_frame, text=f"[{source}] {headline}",
+                command=lambda n=SOURCES[source]["name"], u=news_url, h=headline: self.show_description_from_json(n, u, window, h)
+            ).pack(fill="x", pady=2)
+
+    def show_description_from_json(self, newspaper, news_url, previous_window, headline=None):
         from_path = {
             "The Economic Times": ("ET", "et_stories.json"),
             "The Hindu": ("TH", "th_stories.json"),
@@ -488,39 +744,38 @@ class NewsApp:
             with open(json_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
     
-            for item in data:
-                if item.get("Headline") == headline:
-                    index = item.get("Index", None)
-    
-                    if index is not None:
-                        try:
-                            if newspaper == "The Economic Times":
-                                scrape_single_et_article(index)
-                            elif newspaper == "The Hindu":
-                                scrape_single_th_article(index)
-                            elif newspaper == "The Indian Express":
-                                scrape_single_ie_article(index)
-                            elif newspaper == "Times of India":
-                                scrape_single_toi_article(index)
-    
-                            # Reload JSON after scrape
-                            with open(json_path, 'r', encoding='utf-8') as updated_file:
-                                data = json.load(updated_file)
-                                item = next((x for x in data if x.get("Index") == index), item)
-    
-                        except Exception as e:
-                            print(f"[ERROR] Failed to refresh {newspaper} article: {e}")
-    
-                    title = item.get("Headline", "No Title")
-                    paragraph = item.get("Paragraph", "No Description")
-                    image_url = item.get("Image Path") or item.get("Image URL")
-                    datetime_str = item.get("Date and Time", "")
-                    link = item.get("News URL")
-    
-                    self.open_news_description(title, paragraph, previous_window, image_url, datetime_str, link)
-                    return
-    
-            self.open_news_description("Not Found", f"No article found for: {headline}", previous_window)
+            item = find_story(data, news_url, headline)
+            if item is None:
+                self.open_news_description("Not Found", f"No article found for: {headline or news_url}", previous_window)
+                return
+
+            index = item.get("Index", None)
+
+            if index is not None:
+                prefetcher = self.prefetchers.get(newspaper)
+                # A prefetch of this story in flight is waited for, not repeated,
+                # within the click's own deadline
+                wait = (lambda timeout: prefetcher.wait(index, timeout)) if prefetcher else None
+                try:
+                    load_detail_scraper(newspaper)(index, wait=wait)
+
+                    # Reload JSON after scrape
+                    with open(json_path, 'r', encoding='utf-8') as updated_file:
+                        data = json.load(updated_file)
+                        item = find_story(data, news_url) or item
+
+                except Exception as e:
+                    print(f"[ERROR] Failed to refresh {newspaper} article: {e}")
+                if prefetcher:
+                    prefetcher.read(index)
+
+            title = item.get("Headline") or "No Title"
+            paragraph = item.get("Paragraph") or "No Description"
+            image_url = item.get("Image Path") or item.get("Image URL")
+            datetime_str = item.get("Date and Time") or ""
+            link = item.get("News URL")
+
+            self.open_news_description(title, paragraph, previous_window, image_url, datetime_str, link)
     
         except Exception as e:
             self.open_news_description("Error", f"Failed to load: {e}", previous_window)
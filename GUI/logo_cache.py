@@ -0,0 +1,48 @@
+import os
+import struct
+
+# Resized copies of the newspaper logos live here so start-up never has to
+# decode and resample them again. Run this file to build the cache ahead of time.
+CACHE_DIR = os.path.join("news_images", ".cache")
+LOGOS = [
+    "news_images/economic_times.png",
+    "news_images/the_hindu.png",
+    "news_images/indian_express.png",
+    "news_images/times_of_india.png",
+]
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_size(path):
+    # Width and height straight from the IHDR chunk, without decoding the image
+    with open(path, "rb") as f:
+        head = f.read(24)
+    if head[:8] != PNG_SIGNATURE:
+        return None
+    return struct.unpack(">II", head[16:24])
+
+
+def cached_logo(path, size=(400, 400)):
+    """Return the path of a PNG of exactly `size` for the image at `path`."""
+    size = tuple(size)
+    if png_size(path) == size:
+        return path
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(CACHE_DIR, f"{name}_{size[0]}x{size[1]}.png")
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return cached
+
+    # Only a stale or missing cache entry pays for PIL
+    from PIL import Image
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{cached}.tmp"
+    Image.open(path).resize(size).save(tmp, format="PNG")
+    os.replace(tmp, cached)
+    return cached
+
+
+if __name__ == "__main__":
+    for logo in LOGOS:
+        print(f"{logo} -> {cached_logo(logo)}")
@@ -0,0 +1,307 @@
+import sys
+import os
+import io
+import re
+import json
+import gzip
+import zlib
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Add project root directory (NEWSAPP) to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from modules.common.store import SOURCES, StoryStore, public
+
+# Fields returned in headline lists; the detail endpoint returns everything
+LIST_FIELDS = ("Index", "Headline", "Date and Time", "Published (UTC)", "Image URL", "News URL")
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+GZIP_MIN_BYTES = 512
+# A UTC offset whose unencoded "+" the query string decoded to a space
+SPACED_OFFSET = re.compile(r"^(.*\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?) (\d{2}:?\d{2})$")
+# One entity tag of an If-None-Match list; weak tags match too
+ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+store = StoryStore(project_root)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def paginate(items, query):
+    try:
+        page = max(1, int(query.get("page", ["1"])[0]))
+        per_page = min(MAX_PER_PAGE, max(1, int(query.get("per_page", [str(DEFAULT_PER_PAGE)])[0])))
+    except ValueError:
+        raise ApiError(400, "page and per_page must be integers")
+    start = (page - 1) * per_page
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total": len(items),
+        "items": items[start:start + per_page],
+    }
+
+
+def time_window(query):
+    # since/until as ISO 8601 (UTC unless an offset is given), in the stored text form
+    bounds = []
+    for name in ("since", "until"):
+        value = query.get(name, [""])[0]
+        if not value:
+            bounds.append(None)
+            continue
+        value = SPACED_OFFSET.sub(r"\1+\2", value.strip())
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            raise ApiError(400, f"{name} must be an ISO 8601 date")
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        bounds.append(moment.astimezone(timezone.utc).isoformat(timespec="seconds"))
+    return bounds
+
+
+def filter_by_time(pairs, query):
+    """Keep (source, story) pairs published inside since/until; sort=published puts the newest first."""
+    since, until = time_window(query)
+    if since or until:
+        pairs = [(source, s) for source, s in pairs if s.published
+                 and (since is None or s.published >= since) and (until is None or s.published <= until)]
+    if query.get("sort", [""])[0] == "published":
+        pairs = sorted(pairs, key=lambda pair: pair[1].published or "", reverse=True)
+    return pairs
+
+
+def headline(story, source=None):
+    data = {key: story.get(key) for key in LIST_FIELDS}
+    if source:
+        data["Source"] = source
+    return data
+
+
+def check_source(code):
+    if code not in SOURCES:
+        raise ApiError(404, f"unknown source {code}")
+    return code
+
+
+def sources_view(query):
+    return [
+        {"code": code, "name": spec["name"], "count": len(store.stories(code))}
+        for code, spec in SOURCES.items()
+    ]
+
+
+def stories_view(query, code):
+    stories = [s for _, s in filter_by_time([(code, s) for s in store.stories(check_source(code))], query)]
+    result = paginate(stories, query)
+    result["items"] = [headline(s) for s in result["items"]]
+    result["source"] = code
+    return result
+
+
+def story_view(query, code, index):
+    try:
+        story = store.story(check_source(code), int(index))
+    except ValueError:
+        raise ApiError(400, "index must be an integer")
+    if story is None:
+        raise ApiError(404, f"no story {index} in {code}")
+    return public(story, code)
+
+
+def search_view(query):
+    q = query.get("q", [""])[0].strip()
+    if not q:
+        raise ApiError(400, "missing q")
+    sources = [check_source(s) for s in query.get("source", [])] or None
+    matches = [headline(story, source) for source, story in filter_by_time(store.search(q, sources), query)]
+    result = paginate(matches, query)
+    result["query"] = q
+    return result
+
+
+# (path segments pattern, view); "{}" matches any single segment
+ROUTES = [
+    (("sources",), sources_view),
+    (("sources", "{}", "stories"), stories_view),
+    (("sources", "{}", "stories", "{}"), story_view),
+    (("search",), search_view),
+]
+
+
+def resolve(parts):
+    for pattern, view in ROUTES:
+        if len(pattern) == len(parts) and all(p == "{}" or p == s for p, s in zip(pattern, parts)):
+            return view, [s for p, s in zip(pattern, parts) if p == "{}"]
+    raise ApiError(404, "not found")
+
+
+def etag_for(url, sources):
+    # The response only changes when one of the JSON files it reads changes
+    h = hashlib.sha1(url.encode("utf-8"))
+    for code in sources:
+        h.update(repr((code, store.version(code))).encode("utf-8"))
+    return f'"{h.hexdigest()[:20]}"'
+
+
+def gzip_etag(etag):
+    # The gzip body is a different representation, so it gets its own validator
+    return f'{etag[:-1]}-gz"'
+
+
+def matching_etag(if_none_match, candidates):
+    """The candidate an If-None-Match header matches, or None.
+
+    The header is `*` or a comma-separated list of entity tags, compared
+    weakly. `*` matches whatever is current: the last candidate, which is the
+    gzip tag when the client takes gzip.
+    """
+    if not if_none_match or not if_none_match.strip():
+        return None
+    if if_none_match.strip() == "*":
+        return candidates[-1]
+    tags = set(ENTITY_TAG.findall(if_none_match))
+    return next((e for e in candidates if e in tags), None)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NewsAppAPI/1.0"
+
+    def do_HEAD(self):
+        self.handle_get(head=True)
+
+    def do_GET(self):
+        self.handle_get()
+
+    def do_POST(self):
+        self.send_json(405, {"error": "read-only API"})
+
+    do_PUT = do_DELETE = do_PATCH = do_POST
+
+    def handle_get(self, head=False):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = tuple(p for p in url.path.split("/") if p)
+        try:
+            if parts == ("stream",):
+                view, args = None, []
+                sources = [check_source(s) for s in query.get("source", [])] or list(SOURCES)
+            else:
+                view, args = resolve(parts)
+                sources = [check_source(args[0])] if args else list(SOURCES)
+            etag = etag_for(self.path, sources)
+            candidates = (etag, gzip_etag(etag)) if self.wants_gzip() else (etag,)
+            if_none_match = self.headers.get("If-None-Match")
+            match = matching_etag(if_none_match, candidates)
+            if match and view is not None and if_none_match.strip() == "*":
+                # `*` matches only a resource that exists; the view raises a 404 for one that does not
+                view(query, *args)
+            if match:
+                return self.send_not_modified(match)
+            if view is None:
+                return self.send_stream(sources, etag, head)
+            self.send_json(200, view(query, *args), etag=etag, head=head)
+        except ApiError as e:
+            self.send_json(e.status, {"error": str(e)}, head=head)
+
+    def wants_gzip(self):
+        return "gzip" in self.headers.get("Accept-Encoding", "")
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_json(self, status, payload, etag=None, head=False):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Vary", "Accept-Encoding")
+        compressed = len(body) >= GZIP_MIN_BYTES and self.wants_gzip()
+        if etag:
+            self.send_header("ETag", gzip_etag(etag) if compressed else etag)
+            self.send_header("Cache-Control", "no-cache")
+        if compressed:
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def send_stream(self, sources, etag, head=False):
+        # One story per line, written as it is serialised (chunked encoding)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+        compressor = None
+        if self.wants_gzip():
+            compressor = zlib.compressobj(5, zlib.DEFLATED, 31)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("ETag", gzip_etag(etag))
+        else:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if head:
+            # No body at all, not even the closing chunk, or a kept-alive connection desyncs
+            return
+        buffer = io.BytesIO()
+        for code in sources:
+            for story in store.stories(code):
+                buffer.write(json.dumps(public(story, code), ensure_ascii=False).encode("utf-8"))
+                buffer.write(b"\n")
+                if buffer.tell() >= 16384:
+                    self.write_chunk(buffer.getvalue(), compressor)
+                    buffer = io.BytesIO()
+        self.write_chunk(buffer.getvalue(), compressor)
+        if compressor:
+            self.write_chunk(compressor.flush())
+        self.end_stream()
+
+    def write_chunk(self, data, compressor=None):
+        if compressor and data:
+            data = compressor.compress(data)
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only HTTP API over the scraped news feed")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    server.verbose = args.verbose
+    print(f"[INFO] Serving news API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Alert matching throughput as the watch list grows: stories per second
+# through the token automaton for 10 up to tens of thousands of terms.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The fixture pages are parsed, not answered from (or written to) the parse cache
+os.environ["NEWSAPP_PARSE_CACHE"] = "0"
+
+from harness import sandbox
+from replay import FIXTURES_DIR
+from modules.common.alerts import Matcher, tokens
+from modules.common.engine import parse_listing
+
+
+def fixture_stories():
+    stories = []
+    with sandbox():
+        for code in ("ET", "TH", "IE", "TOI"):
+            with open(os.path.join(FIXTURES_DIR, code, "listing.html"), "r", encoding="utf-8") as f:
+                stories += parse_listing(code, f.read())
+    return stories
+
+
+def watch_list(count, vocabulary, rng):
+    # Made-up company names that never occur, plus the same ten one- to two-word
+    # phrases from the fixture text at every size, so the number of matches stays
+    # fixed and only the size of the automaton changes
+    phrases = [" ".join(rng.sample(vocabulary, rng.randint(1, 2))) for _ in range(10)]
+    subscriptions = {"fixture": phrases}
+    for i in range(count - len(phrases)):
+        term = f"company{i} {rng.choice(['ltd', 'industries', 'bank', 'motors'])}"
+        subscriptions.setdefault(f"sub{i % 50}", []).append(term)
+    return subscriptions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure alert matching throughput against watch-list size")
+    parser.add_argument("--copies", type=int, default=200, help="times the fixture stories are repeated")
+    parser.add_argument("--terms", type=int, nargs="+", default=[10, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    stories = fixture_stories()
+    texts = [f"{s.headline or ''}\n{s.paragraph or ''}" for s in stories] * args.copies
+    vocabulary = sorted({word for text in texts[:len(stories)] for word in tokens(text)})
+    words = sum(len(tokens(t)) for t in texts[:len(stories)]) / len(stories)
+    print(f"{len(texts)} stories, {words:.0f} words each")
+    print(f"{'terms':>8} {'build ms':>9} {'stories/s':>11} {'matches':>9}")
+
+    for count in args.terms:
+        rng = random.Random(0)
+        start = time.perf_counter()
+        matcher = Matcher(watch_list(count, vocabulary, rng))
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        matches = sum(len(matcher.search(text)) for text in texts)
+        rate = len(texts) / (time.perf_counter() - start)
+        print(f"{count:>8} {build_ms:>9.1f} {rate:>11,.0f} {matches:>9}")
+
+
+if __name__ == "__main__":
+    main()
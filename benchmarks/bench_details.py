@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Filling in the articles of a freshly crawled list against the stand-in server,
+# through the path newspapers/*main.py --details takes (crawl.fill_details, one
+# scrape_details batch), and one scrape_detail call per story as clicks would.
+# The source's own rate limits apply to both.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import sandbox
+from testserver import server
+from modules.common import engine
+from modules.common.crawl import crawl, fill_details
+
+
+def run(code, count, batch):
+    with sandbox():
+        stories = crawl(code)[:count]
+        start = time.perf_counter()
+        if batch:
+            updated = len(fill_details(code, stories, count))
+        else:
+            updated = sum(engine.scrape_detail(code, story.index, deadline=None) is not None for story in stories)
+        return time.perf_counter() - start, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time filling in a crawled list, batched and one by one")
+    parser.add_argument("sources", nargs="*", default=["TH", "TOI"])
+    parser.add_argument("--count", type=int, default=20, help="stories from the top of the list")
+    parser.add_argument("--latency", type=float, default=150, help="server response time, ms")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    httpd = server.make_server(port=0, behaviour=server.Behaviour(latency_ms=args.latency))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    os.environ["NEWSAPP_BASE_URL"] = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    print(f"{args.latency:.0f} ms per response, median of {args.repeat}")
+    print(f"{'src':<4} {'stories':>8} {'one by one s':>13} {'batch s':>8} {'speed-up':>9}")
+    for code in args.sources:
+        times = {}
+        for batch in (False, True):
+            runs = sorted(run(code, args.count, batch) for _ in range(args.repeat))
+            times[batch], updated = runs[args.repeat // 2]
+        print(f"{code:<4} {updated:>8} {times[False]:>13.2f} {times[True]:>8.2f} {times[False] / times[True]:>8.1f}x")
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
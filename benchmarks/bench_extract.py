@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+from functools import partial
+
+# Article extraction throughput by number of parse workers: the fixture
+# article pages of every paper, repeated, through modules.common.workers.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every copy is parsed; answered from the parse cache, the repeats would
+# measure cache hits instead of what extra workers add
+os.environ["NEWSAPP_PARSE_CACHE"] = "0"
+
+from harness import sandbox
+from replay import FIXTURES_DIR
+from modules.common import workers
+from modules.common.engine import extract_record
+from modules.common.sources import SOURCES
+
+
+def pages(copies):
+    batches = {}
+    for code in SOURCES:
+        with open(os.path.join(FIXTURES_DIR, code, "article.html"), "rb") as f:
+            html = f.read()
+        batches[code] = [(f"{SOURCES[code]['base_url']}/article/{i}", html, "utf-8") for i in range(copies)]
+    return batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure article extraction throughput against worker count")
+    parser.add_argument("--copies", type=int, default=100, help="article pages per paper")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, workers.usable_cpus()}))
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per pool size; the median is shown")
+    args = parser.parse_args()
+
+    batches = pages(args.copies)
+    total = sum(len(b) for b in batches.values())
+    print(f"{total} article pages, {workers.usable_cpus()} usable cores")
+    print(f"{'workers':>8} {'pages/s':>9} {'speed-up':>9}")
+    baseline = None
+    with sandbox(quiet=False):
+        # One untimed pass in this process, so the first pool size does not pay for
+        # the date formats learned and the regexes compiled on first use
+        for code, batch in batches.items():
+            for page in batch:
+                extract_record(code, page)
+        for count in args.workers:
+            workers.WORKERS = count
+            workers._pool = None
+            # Start the pool outside the timing; its cost is paid once per process
+            workers.map_cpu(partial(extract_record, "ET"), batches["ET"][:workers.INLINE_BELOW])
+            rates = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for code, batch in batches.items():
+                    workers.map_cpu(partial(extract_record, code), batch)
+                rates.append(total / (time.perf_counter() - start))
+            rate = sorted(rates)[len(rates) // 2]
+            baseline = baseline or rate
+            print(f"{count:>8} {rate:>9.0f} {rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Listing and article extraction of the fixture pages with the parse cache:
+# the first (cold) parse of a page against a repeat answered from memory, and
+# one read back from disk by a fresh process.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import sandbox
+from replay import FIXTURES_DIR
+from modules.common import parsecache
+from modules.common.engine import extract_record, parse_listing
+from modules.common.sources import SOURCES
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time extraction with and without the parse cache")
+    parser.add_argument("sources", nargs="*", default=list(SOURCES))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # harness turns the cache off for the scraper benchmarks; this one measures it
+    parsecache.ENABLED = True
+    rows = []
+    with sandbox():
+        for code in args.sources:
+            for kind in ("listing", "article"):
+                with open(os.path.join(FIXTURES_DIR, code, f"{kind}.html"), "rb") as f:
+                    raw = f.read()
+                if kind == "listing":
+                    html = raw.decode("utf-8")
+                    run = lambda: parse_listing(code, html)
+                else:
+                    page = (f"{SOURCES[code]['base_url']}/article/1", raw, "utf-8")
+                    run = lambda: extract_record(code, page)
+
+                def cold():
+                    parsecache._memory.clear()
+                    parsecache.ENABLED = False
+                    run()
+                    parsecache.ENABLED = True
+
+                def disk():
+                    parsecache._memory.clear()
+                    run()
+
+                cold_ms = timed(cold, args.repeat)
+                run()
+                memory_ms = timed(run, args.repeat)
+                disk_ms = timed(disk, args.repeat)
+                rows.append((code, kind, cold_ms, memory_ms, disk_ms))
+
+    print(f"{'source':<6} {'page':<8} {'cold ms':>8} {'memory ms':>10} {'disk ms':>8}")
+    for code, kind, cold_ms, memory_ms, disk_ms in rows:
+        print(f"{code:<6} {kind:<8} {cold_ms:>8.2f} {memory_ms:>10.3f} {disk_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Click-to-article latency of a typical visit to one paper's headline list, with
+# and without prefetching, against the stand-in server. The visit follows the
+# GUI's triggers: the list renders and goes idle, the top story is read, then
+# the next one, then a headline further down is hovered before it is clicked.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Prefetched articles are only useful while the detail ledger keeps them current
+os.environ.setdefault("NEWSAPP_DETAIL_TTL", "3600")
+
+from harness import sandbox
+from testserver import server
+from modules.common import engine, prefetch
+from modules.common.crawl import crawl
+from modules.common.ratelimit import configure
+
+
+def visit(code, use_prefetch, think):
+    # [(what was clicked, seconds until the article was ready)]
+    stories = engine.load_stories(engine.SOURCES[code]["json"], code)
+    prefetcher = prefetch.Prefetcher(code) if use_prefetch else None
+    clicks = []
+
+    def click(position, label):
+        index = stories[position].index
+        start = time.perf_counter()
+        wait = (lambda timeout: prefetcher.wait(index, timeout)) if prefetcher else None
+        engine.scrape_detail(code, index, wait=wait)
+        clicks.append((label, time.perf_counter() - start))
+        if prefetcher:
+            prefetcher.read(index)
+
+    time.sleep(0.4)
+    if prefetcher:
+        prefetcher.idle()
+    time.sleep(think)
+    click(0, "top story")
+    time.sleep(think)
+    click(1, "next story")
+    if prefetcher:
+        prefetcher.hover(6)
+    time.sleep(0.3)
+    click(6, "hovered story")
+    if prefetcher:
+        prefetcher.close()
+    return clicks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time article opens with and without prefetching")
+    parser.add_argument("source", nargs="?", default="TH")
+    parser.add_argument("--latency", type=float, default=200, help="server response time, ms")
+    parser.add_argument("--bandwidth", type=float, default=512, help="KB/s per response")
+    parser.add_argument("--think", type=float, default=2.0, help="seconds spent reading before a click")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    configure(args.source, rate=1e9, burst=1e9, concurrency=64)
+    behaviour = server.Behaviour(latency_ms=args.latency, bandwidth_kbps=args.bandwidth)
+    httpd = server.make_server(port=0, behaviour=behaviour)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    os.environ["NEWSAPP_BASE_URL"] = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    results = {}
+    for use_prefetch in (False, True):
+        for _ in range(args.repeat):
+            with sandbox():
+                crawl(args.source)
+                requests_before = httpd.stats.snapshot()["requests"]
+                for label, seconds in visit(args.source, use_prefetch, args.think):
+                    results.setdefault((label, use_prefetch), []).append(seconds)
+                time.sleep(1.0)
+                requests = httpd.stats.snapshot()["requests"] - requests_before
+                results.setdefault(("requests", use_prefetch), []).append(requests)
+    httpd.shutdown()
+
+    print(f"{args.source}: {args.latency:.0f} ms + {args.bandwidth:.0f} KB/s per response, median of {args.repeat}")
+    print(f"{'click':<16} {'no prefetch ms':>15} {'prefetch ms':>12}")
+    for label in ("top story", "next story", "hovered story"):
+        plain, fetched = (sorted(results[(label, p)])[args.repeat // 2] * 1000 for p in (False, True))
+        print(f"{label:<16} {plain:>15.1f} {fetched:>12.1f}")
+    plain, fetched = (sorted(results[("requests", p)])[args.repeat // 2] for p in (False, True))
+    print(f"{'requests':<16} {plain:>15} {fetched:>12}")
+
+
+if __name__ == "__main__":
+    main()
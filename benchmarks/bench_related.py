@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Related-article lookups against an index of synthetic stories: time to
+# build it, the first lookup of a fresh process and the p50/p99 of later ones.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import sandbox
+from bench_topics import fixture_stories, synthetic
+from modules.common import related
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time related-article lookups against index size")
+    parser.add_argument("--stories", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with sandbox():
+        archive = synthetic(fixture_stories(), args.stories, 0, rng)
+        start = time.perf_counter()
+        # Arrive in refresh-sized batches, as the scrapers would add them
+        for code, stories in archive.items():
+            for i in range(0, len(stories), 500):
+                related.index_stories(code, stories[i:i + 500])
+        build = time.perf_counter() - start
+        urls = [story.news_url for stories in archive.values() for story in stories]
+
+        related._indexes.clear()
+        start = time.perf_counter()
+        related.related_stories(rng.choice(urls))
+        first = (time.perf_counter() - start) * 1000
+
+        times = []
+        for _ in range(args.lookups):
+            start = time.perf_counter()
+            related.related_stories(rng.choice(urls))
+            times.append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.stories} stories indexed in {build:.1f}s")
+    print(f"first lookup {first:.1f} ms (maps the index), then p50 {percentile(times, 0.5):.1f} ms, "
+          f"p99 {percentile(times, 0.99):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
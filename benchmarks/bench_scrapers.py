@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import tracemalloc
+
+from harness import BENCH_SOURCES, sandbox, place_fixture
+from replay import FIXTURES_DIR, ReplaySession, install
+from bs4 import BeautifulSoup
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "history.jsonl")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def traced(fn):
+    # Net allocations and peak traced memory of a single call
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    diff = [d for d in after.compare_to(before, "filename") if d.size_diff > 0]
+    return {
+        "alloc_blocks": sum(d.count_diff for d in diff),
+        "alloc_kb": round(sum(d.size_diff for d in diff) / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def bench_source(code, repeat):
+    spec = BENCH_SOURCES[code]
+    listing_fixture = os.path.join(FIXTURES_DIR, code, "listing.html")
+    article_fixture = os.path.join(FIXTURES_DIR, code, "article.html")
+    with open(listing_fixture, "r", encoding="utf-8") as f:
+        listing_html = f.read()
+    with open(article_fixture, "r", encoding="utf-8") as f:
+        article_html = f.read()
+
+    result = {
+        "listing_parse_ms": timed(lambda: BeautifulSoup(listing_html, "html.parser"), repeat),
+        "detail_parse_ms": timed(lambda: BeautifulSoup(article_html, "html.parser"), repeat),
+    }
+    with sandbox():
+        place_fixture(listing_fixture, spec["html_path"])
+        listing = lambda: spec["listing"](spec["html_path"])
+        result["listing_ms"] = timed(listing, repeat)
+        result.update({f"listing_{k}": v for k, v in traced(listing).items()})
+
+        detail = lambda: spec["detail"](1)
+        result["detail_ms"] = timed(detail, repeat)
+        result.update({f"detail_{k}": v for k, v in traced(detail).items()})
+    return result
+
+
+def previous_run(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def regressions(current, previous, threshold):
+    found = []
+    for code, metrics in current["results"].items():
+        before = previous["results"].get(code, {})
+        for key, value in metrics.items():
+            old = before.get(key)
+            if key.endswith(("_ms", "_kb")) and old and value > old * (1 + threshold):
+                found.append(f"{code} {key}: {old} -> {value} (+{(value / old - 1) * 100:.0f}%)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every scraper against the fixture pages")
+    parser.add_argument("sources", nargs="*", default=list(BENCH_SOURCES), help="ET TH IE TOI")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown counted as a regression")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    session = ReplaySession()
+    install(session)
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "results": {},
+    }
+    for code in args.sources:
+        run["results"][code] = bench_source(code, args.repeat)
+        metrics = run["results"][code]
+        print(f"{code:<4} listing {metrics['listing_ms']:>8.2f} ms (parse {metrics['listing_parse_ms']:.2f}, "
+              f"peak {metrics['listing_peak_kb']:.0f} KB)  detail {metrics['detail_ms']:>8.2f} ms "
+              f"(parse {metrics['detail_parse_ms']:.2f}, peak {metrics['detail_peak_kb']:.0f} KB)")
+
+    if session.misses:
+        print(f"[WARNING] {len(session.misses)} requests had no recorded fixture, e.g. {session.misses[0]}")
+
+    previous = previous_run(RESULTS_PATH)
+    found = regressions(run, previous, args.threshold) if previous else []
+    for line in found:
+        print(f"[REGRESSION] {line}")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Saved results to {RESULTS_PATH}")
+
+    if found and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+# Memory and CPU of holding an archive of stories as plain dicts versus Story
+# records. The archive is built by repeating one scraped listing per source.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import BENCH_SOURCES, sandbox, place_fixture
+from replay import FIXTURES_DIR, ReplaySession, install
+from modules.common.story import decode_stories, diff_stories
+
+
+def scraped_rows():
+    install(ReplaySession())
+    rows = {}
+    with sandbox():
+        for code, spec in BENCH_SOURCES.items():
+            place_fixture(os.path.join(FIXTURES_DIR, code, "listing.html"), spec["html_path"])
+            spec["listing"](spec["html_path"])
+            json_path = next(os.path.join(root, name) for root, _, names in os.walk(os.path.join("files", code))
+                             for name in names if name.endswith(".json"))
+            with open(json_path, "r", encoding="utf-8") as f:
+                rows[code] = json.load(f)
+    return rows
+
+
+def archive_text(rows, copies):
+    # One JSON document per source, with distinct URLs and the old placeholder strings
+    archive = {}
+    for code, stories in rows.items():
+        items = []
+        for copy in range(copies):
+            for story in stories:
+                item = {k: ("No image alt text" if v is None else v) for k, v in story.items()}
+                item["News URL"] = f"{story['News URL']}#{copy}"
+                items.append(item)
+        archive[code] = json.dumps(items)
+    return archive
+
+
+def median_ms(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def measure(load, repeat):
+    # Time without tracing, then load again under tracemalloc for the held and peak size
+    elapsed = median_ms(load, repeat)
+    tracemalloc.start()
+    held = load()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, elapsed, size / (1024 * 1024), peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dict and Story representations of a story archive")
+    parser.add_argument("--copies", type=int, default=500, help="times each scraped listing is repeated")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs; the median is shown")
+    args = parser.parse_args()
+
+    archive = archive_text(scraped_rows(), args.copies)
+    total = sum(len(json.loads(text)) for text in archive.values())
+
+    def as_dicts():
+        return {code: json.loads(text) for code, text in archive.items()}
+
+    def as_records():
+        return {code: decode_stories(text, code) for code, text in archive.items()}
+
+    dicts, dict_ms, dict_mb, dict_peak = measure(as_dicts, args.repeat)
+    records, record_ms, record_mb, record_peak = measure(as_records, args.repeat)
+
+    def diff_dicts():
+        for stories in dicts.values():
+            # Same work as diff_stories: match by URL, then list changed fields
+            before = {s["News URL"]: s for s in stories}
+            after = {s["News URL"]: s for s in stories}
+            for url, s in after.items():
+                if url in before:
+                    [k for k in s if k != "Index" and s[k] != before[url].get(k)]
+
+    def diff_records():
+        for stories in records.values():
+            diff_stories(stories, stories)
+
+    dict_diff_ms = median_ms(diff_dicts, args.repeat)
+    record_diff_ms = median_ms(diff_records, args.repeat)
+
+    print(f"{total} stories, median of {args.repeat}")
+    print(f"{'':<8} {'held MB':>9} {'peak MB':>9} {'load ms':>9} {'diff ms':>9}")
+    print(f"{'dict':<8} {dict_mb:>9.1f} {dict_peak:>9.1f} {dict_ms:>9.1f} {dict_diff_ms:>9.1f}")
+    print(f"{'Story':<8} {record_mb:>9.1f} {record_peak:>9.1f} {record_ms:>9.1f} {record_diff_ms:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+# Click-to-article latency against the stand-in server when a few article
+# requests stall: no deadline, a deadline that falls back to the stored copy,
+# and the deadline with a hedged second request after the source's p95.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import sandbox
+from testserver import server
+from modules.common import engine, latency
+from modules.common.crawl import crawl
+from modules.common.ratelimit import configure
+
+
+class TailBehaviour(server.Behaviour):
+    # Most requests take latency_ms; slow_rate of them stall for slow_ms
+    def __init__(self, latency_ms, slow_ms, slow_rate, seed=1):
+        super().__init__(latency_ms=latency_ms, seed=seed)
+        self.slow_ms = slow_ms
+        self.slow_rate = slow_rate
+
+    def delay(self):
+        with self.lock:
+            slow = self.random.random() < self.slow_rate
+        return (self.slow_ms if slow else self.latency_ms) / 1000
+
+
+def quantile(times, p):
+    times = sorted(times)
+    return times[min(len(times) - 1, int(len(times) * p))]
+
+
+def run(code, clicks, deadline, hedge):
+    engine.HEDGE = hedge
+    latency._samples = None
+    times = []
+    with sandbox():
+        crawl(code)
+        stories = engine.load_stories(engine.SOURCES[code]["json"], code)
+        # Earlier runs have timed this source's fetches, as they would have in use
+        for _ in range(2 * latency.MIN_SAMPLES):
+            engine.fetch_within(code, stories[0].news_url, 0, time.monotonic() + 10)
+        for click in range(clicks):
+            start = time.perf_counter()
+            engine.scrape_detail(code, stories[click % len(stories)].index, deadline=deadline)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time detail clicks when some article requests stall")
+    parser.add_argument("source", nargs="?", default="TH")
+    parser.add_argument("--clicks", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=40, help="usual response time, ms")
+    parser.add_argument("--slow", type=float, default=3000, help="response time of a stalled request, ms")
+    parser.add_argument("--slow-rate", type=float, default=0.04)
+    parser.add_argument("--deadline", type=float, default=1.0, help="seconds")
+    args = parser.parse_args()
+
+    # The politeness limits are for the real sites, not for a server on this machine
+    configure(args.source, rate=1e9, burst=1e9, concurrency=64)
+    httpd = server.make_server(port=0, behaviour=TailBehaviour(args.latency, args.slow, args.slow_rate))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    os.environ["NEWSAPP_BASE_URL"] = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    rows = []
+    for label, deadline, hedge in (("no deadline", None, False),
+                                   ("deadline", args.deadline, False),
+                                   ("deadline + hedge", args.deadline, True)):
+        random.seed(1)
+        httpd.behaviour.random.seed(1)
+        times = run(args.source, args.clicks, deadline, hedge)
+        rows.append((label, *(quantile(times, p) * 1000 for p in (0.5, 0.95, 0.99)), max(times) * 1000))
+    httpd.shutdown()
+
+    print(f"{args.source}: {args.clicks} clicks, {args.slow_rate:.0%} of requests stall for {args.slow:.0f} ms")
+    print(f"{'mode':<18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, p50, p95, p99, worst in rows:
+        print(f"{label:<18} {p50:>8.0f} {p95:>8.0f} {p99:>8.0f} {worst:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
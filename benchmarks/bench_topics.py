@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Time of the topic stage on a synthetic archive: a cold run over the whole
+# window, the labelling a refresh does for its new stories, then an
+# incremental run after a batch of new stories arrives.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import sandbox
+from replay import FIXTURES_DIR
+from modules.common.engine import parse_listing
+from modules.common.sources import SOURCES
+from modules.common.story import Story, load_stories, save_stories
+from modules.common.topics import assign_topics, update_topics
+
+
+def fixture_stories():
+    stories = []
+    for code in SOURCES:
+        with open(os.path.join(FIXTURES_DIR, code, "listing.html"), "r", encoding="utf-8") as f:
+            stories += parse_listing(code, f.read())
+    return stories
+
+
+def synthetic(base, count, start, rng):
+    # Each story is a fixture story with a third of its words swapped for
+    # words of another one, so stories cluster around their originals
+    stories = {code: [] for code in SOURCES}
+    for i in range(start, start + count):
+        story, other = rng.choice(base), rng.choice(base)
+        words = f"{story.headline} {story.paragraph or ''}".split()
+        noise = f"{other.headline} {other.paragraph or ''}".split()
+        words = [rng.choice(noise) if rng.random() < 0.33 else w for w in words]
+        code = story.source
+        stories[code].append(Story(
+            code, len(stories[code]) + 1, headline=" ".join(words[:12]), paragraph=" ".join(words[12:]),
+            news_url=f"{story.news_url}?n={i}", published=f"2025-06-{1 + i % 28:02d}T{i % 24:02d}:00:00+00:00",
+        ))
+    return stories
+
+
+def write(stories):
+    for code, items in stories.items():
+        os.makedirs(os.path.dirname(SOURCES[code]["json"]), exist_ok=True)
+        save_stories(items, SOURCES[code]["json"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the topic stage on a synthetic story archive")
+    parser.add_argument("--stories", type=int, default=50000)
+    parser.add_argument("--new", type=int, default=1000, help="stories added before the incremental run")
+    parser.add_argument("--refresh", type=int, default=25, help="new stories one refresh labels")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    base = fixture_stories()
+    with sandbox():
+        archive = synthetic(base, args.stories, 0, rng)
+        write(archive)
+        start = time.perf_counter()
+        update_topics()
+        cold = time.perf_counter() - start
+
+        # What store_listing does before saving a refresh; these stories are not written
+        arrivals = [story for items in synthetic(base, args.refresh, 2 * args.stories, rng).values()
+                    for story in items]
+        start = time.perf_counter()
+        assign_topics(arrivals)
+        ingest = time.perf_counter() - start
+
+        # New arrivals on top of the labelled archive, as after a refresh
+        for code, items in synthetic(base, args.new, args.stories, rng).items():
+            archive[code] = items + load_stories(SOURCES[code]["json"], code)
+        write(archive)
+        start = time.perf_counter()
+        changed = update_topics(config={"window": args.stories + args.new})
+        warm = time.perf_counter() - start
+
+    print(f"{args.stories} stories: cold run {cold:.2f}s")
+    print(f"refresh of {args.refresh} new stories: labelled in {ingest * 1000:.0f} ms")
+    print(f"+{args.new} new: incremental run {warm:.2f}s, {sum(changed.values())} labels changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import argparse
+
+# Regression check for clicks on prefetched stories. A prefetch stores the
+# article's own headline over the listing's, before the user clicks the button
+# drawn with the old one. The GUI must still find the story behind the button.
+# Prefetches the top of each paper's list offline, from the fixtures, then
+# looks each story up with the GUIs' own load_headlines_from_json and find_story.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Prefetched articles stay current, as they would between list and click
+os.environ.setdefault("NEWSAPP_DETAIL_TTL", "3600")
+
+from harness import sandbox
+from replay import ReplaySession, install
+from modules.common import prefetch
+from modules.common.crawl import crawl
+from modules.common.sources import SOURCES
+from GUI import gui, gui3
+
+
+def check(code):
+    # [(what was checked, passed)]
+    name = SOURCES[code]["name"]
+    results = []
+    crawl(code)
+    # What the headline buttons are drawn with; load_headlines_from_json does not use self
+    buttons = gui.NewsApp.load_headlines_from_json(None, name)[:prefetch.TOP_ITEMS]
+    with open(SOURCES[code]["json"], "r", encoding="utf-8") as f:
+        listed = json.load(f)[:prefetch.TOP_ITEMS]
+
+    prefetcher = prefetch.Prefetcher(code)
+    prefetcher.idle()
+    for item in listed:
+        prefetcher.wait(item["Index"], timeout=30)
+    prefetcher.close()
+
+    with open(SOURCES[code]["json"], "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    renamed = sum((item.get("Headline") or "No Title") != headline
+                  for item, (headline, _, _) in zip(stored, buttons))
+    for module in (gui, gui3):
+        found = [module.find_story(stored, news_url, headline) for headline, _, news_url in buttons]
+        results.append((f"{module.__name__} finds every prefetched story ({renamed} renamed)",
+                        all(item is not None and item.get("News URL") == news_url
+                            for item, (_, _, news_url) in zip(found, buttons))))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the GUI finds stories whose headline a prefetch replaced")
+    parser.add_argument("sources", nargs="*", default=["ET", "TH", "IE", "TOI"])
+    args = parser.parse_args()
+
+    install(ReplaySession())
+    failed = 0
+    for code in args.sources:
+        with sandbox():
+            results = check(code)
+        for description, passed in results:
+            failed += not passed
+            print(f"{code:<4} {'ok' if passed else 'FAILED':<7} {description}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+# Regression check for saves that finish after a refresh. A click or prefetch
+# reads the stored list, fetches its article, and saves; meanwhile a refresh
+# (the GUI's background refresh or a scraper process) may have renumbered the
+# list. The late save must land on its own story, by URL, and leave the rest of
+# the new list as the refresh wrote it. Runs offline against the fixtures.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import sandbox
+from replay import ReplaySession, install
+from modules.common import engine
+from modules.common.crawl import crawl
+from modules.common.story import Story, load_stories
+
+# Waits on the stories lock in a separate process, as a scraper's save does
+LOCKER = ("import sys; sys.path.insert(0, sys.argv[1]);"
+          "from modules.common.engine import stories_lock\n"
+          "with stories_lock(sys.argv[2]): pass")
+
+
+def check(code):
+    # [(what was checked, passed)]
+    spec = engine.SOURCES[code]
+    json_path, csv_path = spec["json"], spec["csv"]
+    results = []
+
+    # The crawl a background refresh runs, then a click that reads the first story
+    crawl(code)
+    before = load_stories(json_path, code)
+    listing = engine.listing_urls(before)
+    stale = load_stories(json_path, code)[0]
+    stale.paragraph = "Full text fetched before the refresh."
+
+    # A refresh that puts a new story on top renumbers every other one
+    fresh = Story(code, 1, headline="Story new in this refresh", news_url="https://example.com/new-story")
+    moved = [Story(code, story.index + 1, story.headline, story.paragraph, story.date_time,
+                   story.news_url, story.image_url, story.image_alt, published=story.published)
+             for story in before]
+    engine.store_listing(code, [fresh] + moved)
+    refreshed = load_stories(json_path, code)
+
+    saved = engine.persist_stories(code, [stale], json_path, csv_path, fetched=True)
+    after = load_stories(json_path, code)
+    results.append(("late click saves its own story", [s.index for s in saved] == [2]
+                    and after[1].news_url == stale.news_url and after[1].paragraph == stale.paragraph))
+    results.append(("new list keeps its order and size",
+                    engine.listing_urls(after) == engine.listing_urls(refreshed)))
+    results.append(("story now first is untouched", after[0] == refreshed[0]))
+    results.append(("other stories are untouched", after[2:] == refreshed[2:]))
+
+    # A prefetch started on the old list stores nothing once it has been replaced
+    late = load_stories(json_path, code)[3]
+    late.paragraph = "Prefetched for the old list."
+    saved = engine.persist_stories(code, [late], json_path, csv_path, listing=listing)
+    results.append(("late prefetch is not saved", saved == [] and load_stories(json_path, code) == after))
+
+    # A story the refresh dropped is not written back
+    gone = Story(code, 1, headline="Dropped", news_url="https://example.com/dropped", paragraph="Text")
+    saved = engine.persist_stories(code, [gone], json_path, csv_path)
+    results.append(("dropped story is not saved", saved == [] and load_stories(json_path, code) == after))
+
+    # The lock holds off a save from another process
+    with engine.stories_lock(json_path):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        locker = subprocess.Popen([sys.executable, "-c", LOCKER, root, json_path])
+        time.sleep(1.0)
+        waited = locker.poll() is None
+    results.append(("lock is held across processes", waited and locker.wait(timeout=10) == 0))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that saves finishing after a refresh keep the new list intact")
+    parser.add_argument("sources", nargs="*", default=["ET", "TH", "IE", "TOI"])
+    args = parser.parse_args()
+
+    install(ReplaySession())
+    failed = 0
+    for code in args.sources:
+        with sandbox():
+            results = check(code)
+        for name, passed in results:
+            failed += not passed
+            print(f"{code:<4} {'ok' if passed else 'FAILED':<7} {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import json
+import argparse
+
+from harness import BENCH_SOURCES, sandbox
+from replay import FIXTURES_DIR, RecordingSession, install
+
+
+def record_source(code, session):
+    spec = BENCH_SOURCES[code]
+    session.names[spec["section"]] = f"{code}/listing.html"
+    with sandbox(quiet=False):
+        response = session.get(spec["section"], timeout=10)
+        response.raise_for_status()
+        os.makedirs(os.path.dirname(spec["html_path"]), exist_ok=True)
+        with open(spec["html_path"], "w", encoding="utf-8") as f:
+            f.write(response.text)
+        # Running the scrapers records every image and the first article
+        spec["listing"](spec["html_path"])
+        json_path = f"files/{code}/{code.lower()}_stories.json"
+        with open(json_path, "r", encoding="utf-8") as f:
+            stories = json.load(f)
+        if not stories:
+            print(f"[WARNING] {code}: no stories found, selectors may be out of date")
+            return
+        session.names[stories[0]["News URL"]] = f"{code}/article.html"
+        spec["detail"](1)
+        # Every other article replays the recorded one
+        for story in stories[1:]:
+            session.manifest[story["News URL"]] = {
+                "url": story["News URL"],
+                "file": f"{code}/article.html",
+                "content_type": "text/html; charset=utf-8",
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-record benchmark fixtures from the live sites")
+    parser.add_argument("sources", nargs="*", default=list(BENCH_SOURCES), help="ET TH IE TOI")
+    args = parser.parse_args()
+
+    session = RecordingSession(FIXTURES_DIR)
+    install(session, throttle=True)
+    try:
+        for code in args.sources:
+            print(f"[INFO] Recording {code}...")
+            record_source(code, session)
+    finally:
+        session.save()
+        session.close()
+    print(f"[INFO] Fixtures saved to {FIXTURES_DIR}")
+
+if __name__ == "__main__":
+    main()
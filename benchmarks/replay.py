@@ -0,0 +1,102 @@
+import os
+import json
+import requests
+
+from modules.common import httpclient
+from modules.common.ratelimit import SOURCE_LIMITS, configure
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_manifest(fixtures_dir=FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        return {entry["url"]: entry for entry in json.load(f)}
+
+
+def make_response(url, status, content=b"", content_type="text/html; charset=utf-8"):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response._content = content
+    # The whole body is already here; iter_content() serves it for stream=True callers
+    response._content_consumed = True
+    response.headers["Content-Type"] = content_type
+    response.headers["Content-Length"] = str(len(content))
+    if content_type.startswith("text/"):
+        response.encoding = "utf-8"
+    return response
+
+
+class ReplaySession:
+    """Stands in for requests.Session and answers only from recorded fixtures."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.manifest = load_manifest(fixtures_dir)
+        self.bodies = {}
+        self.requests = 0
+        self.misses = []
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        entry = self.manifest.get(url)
+        if entry is None:
+            self.misses.append(url)
+            return make_response(url, 404, b"not recorded")
+        body = self.bodies.get(entry["file"])
+        if body is None:
+            with open(os.path.join(self.fixtures_dir, entry["file"]), "rb") as f:
+                body = f.read()
+            self.bodies[entry["file"]] = body
+        return make_response(url, 200, body, entry["content_type"])
+
+    def close(self):
+        pass
+
+
+class RecordingSession:
+    """Wraps a real session and saves every response as a fixture."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.session = requests.Session()
+        try:
+            self.manifest = load_manifest(fixtures_dir)
+        except OSError:
+            self.manifest = {}
+        self.names = {}
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        if response.ok:
+            content_type = response.headers.get("Content-Type", "text/html; charset=utf-8")
+            if content_type.startswith("image/"):
+                name = "image.jpg"
+            else:
+                name = self.names.get(url) or f"recorded/{len(self.manifest):04d}.html"
+            path = os.path.join(self.fixtures_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if not (name == "image.jpg" and os.path.exists(path)):
+                with open(path, "wb") as f:
+                    f.write(response.content)
+            self.manifest[url] = {"url": url, "file": name, "content_type": content_type}
+        return response
+
+    def save(self):
+        with open(os.path.join(self.fixtures_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(list(self.manifest.values()), f, indent=1)
+
+    def close(self):
+        self.session.close()
+
+
+def install(session, throttle=False):
+    # Swap the pooled session every module fetches through; returns the old one.
+    # Replayed responses never reach a real host, so rate limits are lifted
+    # unless the caller wants to measure them too.
+    if not throttle:
+        for source in SOURCE_LIMITS:
+            configure(source, rate=1e9, burst=1e9, concurrency=64)
+    previous = httpclient.session
+    httpclient.session = session
+    return previous
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = {"gui": ("GUI.gui", "main1.py"), "gui3": ("GUI.gui3", "main2.py")}
+
+
+def import_times(module):
+    # Parse `python -X importtime` output: "import time: self [us] | cumulative | imported package"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if line.rstrip().endswith("| site"):
+            # Everything up to here is interpreter start-up, not the GUI
+            rows = []
+            continue
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            # Nested imports are indented by two spaces per level after the single separator space
+            rows.append({"module": name.strip(), "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                         "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return rows
+
+
+def time_to_window(script, runs, fast_start):
+    # Launch the app with the start-up probe; it prints "[startup] ready" once the
+    # main window is interactive and then closes itself
+    env = dict(os.environ, NEWSAPP_STARTUP_PROBE="1")
+    args = [sys.executable, script] + (["--fast-start"] if fast_start else [])
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+        if "[startup] ready" not in proc.stdout:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no window")
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report GUI cold-start import cost and time to first window.")
+    parser.add_argument("gui", nargs="?", choices=sorted(ENTRY_POINTS), default="gui")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="launches for the time-to-window measurement")
+    parser.add_argument("--no-window", action="store_true", help="skip launching the GUI")
+    args = parser.parse_args()
+    module, script = ENTRY_POINTS[args.gui]
+
+    rows = import_times(module)
+    total = next(r["cumulative_ms"] for r in reversed(rows) if r["module"] == module)
+    print(f"import {module}: {total:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    # Direct imports of the GUI module, each with everything it pulls in
+    direct = [r for r in rows if r["depth"] == 1]
+    for r in sorted(direct, key=lambda r: r["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{r['cumulative_ms']:>14.1f} {r['self_ms']:>9.1f}  {r['module']}")
+
+    if args.no_window:
+        return
+    for fast_start in (False, True):
+        label = "fast start" if fast_start else "welcome screen"
+        try:
+            print(f"time to window ({label}): {time_to_window(script, args.runs, fast_start):.0f} ms")
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"time to window ({label}): unavailable ({e})")
+
+
+if __name__ == "__main__":
+    main()
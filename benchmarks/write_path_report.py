@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import importlib
+import importlib.util
+import statistics
+import subprocess
+
+# Compares the detail-update write path with and without pandas loaded:
+# import time, peak RSS, scrape_single_*_article latency and the CSV write alone.
+# Each measurement runs in a fresh interpreter so imports are really cold.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DETAIL_MODULES = {
+    "ET": "modules.economictimes.scrape_et_detail_by_index",
+    "TH": "modules.thehindu.scrape_th_detail_by_index",
+    "IE": "modules.indianexpress.scrape_ie_detail_by_index",
+    "TOI": "modules.timesofindia.scrape_toi_detail_by_index",
+}
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def child(code, with_pandas, repeat):
+    sys.path.insert(0, ROOT)
+    # As harness.py sets them, but before the detail module is imported and reads
+    # them: every repeat fetches, parses and writes instead of using the stored copy
+    os.environ.setdefault("NEWSAPP_DETAIL_TTL", "0")
+    os.environ.setdefault("NEWSAPP_PARSE_CACHE", "0")
+    start = time.perf_counter()
+    if with_pandas:
+        # What every scraper process paid before the stdlib CSV writer
+        import pandas
+    importlib.import_module(DETAIL_MODULES[code])
+    result = {"import_ms": round((time.perf_counter() - start) * 1000, 1), "rss_mb": peak_rss_mb()}
+
+    from harness import BENCH_SOURCES, sandbox, place_fixture
+    from modules.common.sources import SOURCES
+    from replay import FIXTURES_DIR, ReplaySession, install
+    from modules.common import story
+    from modules.common.csvout import write_stories_csv
+
+    install(ReplaySession())
+    writer = write_stories_csv
+    if with_pandas:
+        # Run the detail update through the old DataFrame.to_csv writer; save_stories,
+        # which every detail update goes through, calls story.write_stories_csv
+        writer = story.write_stories_csv = lambda stories, path: pandas.DataFrame(stories).to_csv(
+            path, index=False, encoding="utf-8")
+    spec = BENCH_SOURCES[code]
+    samples = []
+    with sandbox():
+        place_fixture(os.path.join(FIXTURES_DIR, code, "listing.html"), spec["html_path"])
+        spec["listing"](spec["html_path"])
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            spec["detail"](1)
+            samples.append((time.perf_counter() - begin) * 1000)
+
+        # files/ also holds ledgers and caches; only the stories file is a list of rows
+        with open(SOURCES[code]["json"], "r", encoding="utf-8") as f:
+            stories = json.load(f)
+        writes = []
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            writer(stories, "out.csv")
+            writes.append((time.perf_counter() - begin) * 1000)
+
+    result["detail_ms"] = round(statistics.median(samples), 2)
+    result["csv_write_ms"] = round(statistics.median(writes), 3)
+    result["rss_after_mb"] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+def measure(code, with_pandas, repeat):
+    args = [sys.executable, os.path.abspath(__file__), "--child", code, "--repeat", str(repeat)]
+    if with_pandas:
+        args.append("--with-pandas")
+    proc = subprocess.run(args, capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the story write path with and without pandas")
+    parser.add_argument("sources", nargs="*", default=list(DETAIL_MODULES), help="ET TH IE TOI")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--with-pandas", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.with_pandas, args.repeat)
+        return
+
+    # Looked up, not imported: a child's peak RSS starts from this process's
+    if importlib.util.find_spec("pandas") is not None:
+        variants = [("pandas", True), ("stdlib", False)]
+    else:
+        print("[INFO] pandas is not installed; reporting the stdlib path only")
+        variants = [("stdlib", False)]
+
+    print(f"{'src':<4} {'writer':<7} {'import ms':>10} {'rss MB':>8} {'detail ms':>10} {'csv ms':>8} {'rss end MB':>11}")
+    for code in args.sources:
+        for label, with_pandas in variants:
+            r = measure(code, with_pandas, args.repeat)
+            print(f"{code:<4} {label:<7} {r['import_ms']:>10.1f} {r['rss_mb']:>8.1f} {r['detail_ms']:>10.2f} "
+                  f"{r['csv_write_ms']:>8.3f} {r['rss_after_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
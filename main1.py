@@ -1,8 +1,10 @@
+import sys
 import tkinter as tk
 from GUI.gui import NewsApp
 
 if __name__ == "__main__":
     root = tk.Tk()
     root.geometry("800x600")
-    app = NewsApp(root)
+    # --fast-start (or NEWSAPP_FAST_START=1) skips the fade-in welcome screen
+    app = NewsApp(root, fast_start="--fast-start" in sys.argv[1:])
     root.mainloop()
@@ -0,0 +1,171 @@
+import os
+import re
+import json
+import time
+import threading
+
+from modules.common import metrics
+from modules.common.filelock import file_lock
+from modules.common.log import get_logger
+from modules.common.seen import SeenLedger
+
+logger = get_logger(__name__)
+
+# Optional JSON file of subscriptions: {"name": ["term", "multi word term", ...], ...}
+ALERTS_FILE = os.environ.get("NEWSAPP_ALERTS", "config/alerts.json")
+# Matches are appended here, one JSON object per line, for whatever delivers them
+OUTBOX = os.environ.get("NEWSAPP_ALERT_OUTBOX", "files/alerts/outbox.jsonl")
+# A story alerts each subscription once; the ledger forgets it after a week
+ALERTED = os.path.join(os.path.dirname(OUTBOX), "alerted.json")
+ALERTED_TTL = 7 * 86400
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokens(text):
+    return TOKEN.findall(text.lower())
+
+
+class Matcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Terms match whole words only ("rain" does not fire on "train"), and one
+    pass over a text finds every term in it: the cost grows with the length
+    of the text, not with the number of terms.
+    """
+
+    def __init__(self, subscriptions):
+        # State 0 is the root; goto[state] maps a token to the next state
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.terms = 0
+        for name, terms in subscriptions.items():
+            for term in terms:
+                words = tokens(term)
+                if words:
+                    self._add(words, (name, term))
+        self._link()
+
+    def _add(self, words, hit):
+        state = 0
+        for word in words:
+            nxt = self.goto[state].get(word)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][word] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            state = nxt
+        self.out[state] += (hit,)
+        self.terms += 1
+
+    def _link(self):
+        # Breadth-first failure links; each state also inherits the output of its fallback
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for word, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(word, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def search(self, text):
+        """{subscription: [terms found]} for one text."""
+        goto, fail, out = self.goto, self.fail, self.out
+        hits = {}
+        state = 0
+        for word in tokens(text):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if out[state]:
+                hits.update(dict.fromkeys(out[state]))
+        found = {}
+        for name, term in hits:
+            found.setdefault(name, []).append(term)
+        return found
+
+
+_matcher = None
+_matcher_version = None
+_matcher_lock = threading.Lock()
+_outbox_lock = threading.Lock()
+# Held from reading the ledger to saving it: refreshes, clicks and prefetches
+# check stories at the same time, and each must see the others' marks. The file
+# lock does the same across processes: the GUI and the newspapers/*main.py scrapers.
+_ledger_lock = threading.Lock()
+
+
+def _ledger_file_lock():
+    return file_lock(f"{ALERTED}.lock")
+
+
+def load_matcher():
+    # Built once per version of the subscriptions file; None when nothing is watched
+    global _matcher, _matcher_version
+    try:
+        st = os.stat(ALERTS_FILE)
+        version = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+    with _matcher_lock:
+        if version != _matcher_version:
+            try:
+                with open(ALERTS_FILE, "r", encoding="utf-8") as f:
+                    subscriptions = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not read %s: %s", ALERTS_FILE, e)
+                subscriptions = {}
+            _matcher = Matcher(subscriptions) if subscriptions else None
+            _matcher_version = version
+            if _matcher:
+                logger.info("Watching %d terms in %d subscriptions", _matcher.terms, len(subscriptions))
+        return _matcher
+
+
+def check_stories(source, stories):
+    """Match stories against every subscription and queue one alert per new (subscription, story).
+
+    Returns the alerts written. Safe to call again with the same stories:
+    a story already alerted for a subscription is skipped.
+    """
+    matcher = load_matcher()
+    if matcher is None or not stories:
+        return []
+    alerts = []
+    with metrics.span("alerts", source), _ledger_lock, _ledger_file_lock():
+        ledger = SeenLedger(ALERTED, ttl=ALERTED_TTL)
+        for story in stories:
+            found = matcher.search(f"{story.headline or ''}\n{story.paragraph or ''}")
+            for name, terms in found.items():
+                key = story.news_url or f"{source}:{story.headline}"
+                if ledger.fresh(name, key):
+                    continue
+                ledger.mark(name, key)
+                alerts.append({
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "subscription": name,
+                    "terms": terms,
+                    "source": source,
+                    "index": story.index,
+                    "headline": story.headline,
+                    "published": story.published,
+                    "news_url": story.news_url,
+                })
+        if alerts:
+            _append_outbox(alerts)
+            ledger.save()
+    if alerts:
+        metrics.count("alerts", source, value=len(alerts))
+        logger.info("%s: %d new alerts", source, len(alerts))
+    return alerts
+
+
+def _append_outbox(alerts):
+    os.makedirs(os.path.dirname(OUTBOX) or ".", exist_ok=True)
+    with _outbox_lock, open(OUTBOX, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(alert, ensure_ascii=False) + "\n" for alert in alerts))
@@ -0,0 +1,15 @@
+from modules.common.store import SOURCES, StoryStore, public
+
+# pandas is an optional extra (requirements-analytics.txt); the scrapers never need it.
+
+
+def stories_frame(sources=None, base_dir="."):
+    """All stored stories of the given sources as one pandas DataFrame with a Source column."""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas is needed for analytics: pip install -r requirements-analytics.txt") from None
+
+    store = StoryStore(base_dir)
+    rows = [public(story, source) for source in sources or SOURCES for story in store.stories(source)]
+    return pd.DataFrame(rows)
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import codecs
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.common import metrics, snapshots
+from modules.common.engine import ListingScanner, compiled, parse_listing, scrape_details, store_listing
+from modules.common.httpclient import get as http_get, stream as http_stream
+from modules.common.log import get_logger
+from modules.common.ratelimit import limits_for
+from modules.common.sources import SOURCES
+
+logger = get_logger(__name__)
+
+# Per-run defaults: listing pages per section, and the budget shared by every
+# page and image fetch of one refresh. max_stories=None keeps every story found.
+# With stream on, a page is read only until it has given the stories the
+# source's listing limit or max_stories asks for; the rest is never downloaded.
+# details is how many stories from the top of the list newspapers/*main.py fill
+# in from their article pages after the crawl, in one batch; 0 leaves that to clicks.
+DEFAULT_CRAWL = {
+    "pages": 1,
+    "max_stories": None,
+    "stream": True,
+    "details": 0,
+    "budget": {"requests": 60, "bytes": 16 * 1024 * 1024, "seconds": 30.0},
+}
+
+# Optional JSON file overriding the crawl per source, e.g.
+# {"ET": {"sections": [...], "pages": 2, "budget": {"seconds": 20}}}
+CRAWL_FILE = os.environ.get("NEWSAPP_CRAWL", "config/crawl.json")
+
+# Bytes read from a streamed page between checks for the last wanted story
+STREAM_CHUNK = 8 * 1024
+
+_overrides = None
+
+
+def _load_overrides():
+    global _overrides
+    if _overrides is None:
+        try:
+            with open(CRAWL_FILE, "r", encoding="utf-8") as f:
+                _overrides = json.load(f)
+        except (OSError, ValueError):
+            _overrides = {}
+    return _overrides
+
+
+def crawl_plan(source):
+    override = _load_overrides().get(source, {})
+    plan = {
+        "sections": list(SOURCES[source]["sections"]),
+        "pages": DEFAULT_CRAWL["pages"],
+        "max_stories": DEFAULT_CRAWL["max_stories"],
+        "stream": DEFAULT_CRAWL["stream"],
+        "details": DEFAULT_CRAWL["details"],
+    }
+    plan.update({k: v for k, v in override.items() if k != "budget"})
+    plan["budget"] = dict(DEFAULT_CRAWL["budget"], **override.get("budget", {}))
+    return plan
+
+
+class Budget:
+    """Requests, bytes and wall time one refresh may spend; thread-safe."""
+
+    def __init__(self, requests, bytes, seconds):
+        self.max_requests = requests
+        self.max_bytes = bytes
+        self.deadline = time.monotonic() + seconds
+        self.requests = 0
+        self.bytes = 0
+        self.exhausted = None
+        self.lock = threading.Lock()
+
+    def take_request(self):
+        # Reserve one request, or return False once any limit is reached
+        with self.lock:
+            if self.exhausted is None:
+                if self.requests >= self.max_requests:
+                    self.exhausted = "requests"
+                elif self.bytes >= self.max_bytes:
+                    self.exhausted = "bytes"
+                elif time.monotonic() >= self.deadline:
+                    self.exhausted = "seconds"
+            if self.exhausted:
+                return False
+            self.requests += 1
+            return True
+
+    def add_bytes(self, n):
+        with self.lock:
+            self.bytes += n
+
+
+def page_urls(source, sections, pages):
+    template = SOURCES[source]["page_url"]
+    for section in sections:
+        yield section
+        for page in range(2, pages + 1):
+            yield template.format(section=section, page=page)
+
+
+def fetch_page(source, url, budget, want=None):
+    if not budget.take_request():
+        return None
+    try:
+        if want:
+            return stream_page(source, url, budget, want)
+        with metrics.span("fetch", source):
+            response = http_get(url, source=source, timeout=10)
+        budget.add_bytes(len(response.content))
+        response.raise_for_status()
+        snapshots.save(source, url, "listing", response.content, response.encoding)
+        with metrics.span("decode", source):
+            return response.text
+    except Exception as e:
+        metrics.count("errors", source, stage="fetch")
+        logger.warning("Could not fetch %s: %s", url, e)
+        return None
+
+
+def stream_page(source, url, budget, want):
+    """A listing page read only as far as the end of its `want`-th story.
+
+    The download is dropped at that point, so the rest of the page costs no
+    bytes, parsing or memory. A page with fewer stories is read to the end.
+    """
+    # An unfinished download cannot go back to the pool; closing the response drops its connection
+    with metrics.span("fetch", source), http_stream(url, source=source, timeout=10) as response:
+        response.raise_for_status()
+        scanner = ListingScanner(source, want)
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        received = []
+        for chunk in response.iter_content(STREAM_CHUNK):
+            received.append(chunk)
+            if scanner.feed(decoder.decode(chunk)):
+                break
+        else:
+            scanner.feed(decoder.decode(b"", final=True))
+        # Content-Length counts the body as sent (gzip, say), so compare it with
+        # what came over the wire rather than with the decoded chunks
+        wire = response.raw.tell() if hasattr(response.raw, "tell") else None
+    read = sum(len(chunk) for chunk in received)
+    budget.add_bytes(read)
+    metrics.count("bytes", source, value=read)
+    total = int(response.headers.get("Content-Length") or 0)
+    wire = read if wire is None else wire
+    if scanner.end is not None and total > wire:
+        metrics.count("bytes_skipped", source, value=total - wire)
+        logger.debug("%s: stopped %s after %d of %d bytes", source, url, wire, total)
+    snapshots.save(source, url, "listing", b"".join(received), response.encoding)
+    return scanner.text()
+
+
+def merge_pages(source, pages, max_stories=None):
+    """Stories of several parsed listing pages in page order, each kept once and numbered from 1."""
+    stories = []
+    seen = set()
+    for page in pages:
+        for story in page:
+            key = story.news_url or story.headline
+            if key in seen:
+                metrics.count("duplicates", source, stage="listing")
+                continue
+            seen.add(key)
+            story.index = len(stories) + 1
+            stories.append(story)
+            if max_stories and len(stories) >= max_stories:
+                return stories
+    return stories
+
+
+def crawl(source):
+    """Fetch every configured section page of a source in parallel and store the merged stories.
+
+    Stories are kept in section and page order; one reached from several pages
+    is kept once. If no page could be fetched the previous stories stay in place.
+    """
+    plan = crawl_plan(source)
+    budget = Budget(**plan["budget"])
+    # A page listed under two sections is still fetched once
+    urls = list(dict.fromkeys(page_urls(source, plan["sections"], plan["pages"])))
+    # No page can give more stories than the listing limit, nor usefully more than max_stories
+    want = min((n for n in (compiled(source).limit, plan["max_stories"]) if n), default=None) \
+        if plan["stream"] else None
+
+    with ThreadPoolExecutor(max_workers=limits_for(source)["concurrency"]) as pool:
+        pages = list(pool.map(lambda url: fetch_page(source, url, budget, want), urls))
+    fetched = [html for html in pages if html is not None]
+    metrics.count("pages", source, value=len(fetched))
+    if not fetched:
+        logger.error("No listing page of %s could be fetched; keeping the previous stories", source)
+        return []
+
+    stories = merge_pages(source, (parse_listing(source, html) for html in fetched), plan["max_stories"])
+    store_listing(source, stories, budget)
+    if budget.exhausted:
+        metrics.count("budget_exhausted", source, limit=budget.exhausted)
+        logger.warning("%s crawl stopped early: %s budget used up", source, budget.exhausted)
+    logger.info("%s: %d pages, %d stories, %d requests, %d bytes", source, len(fetched), len(stories),
+                budget.requests, budget.bytes)
+    return stories
+
+
+def fill_details(source, stories, count=None):
+    """Fill in the articles of the first `count` crawled stories (the plan's details by default).
+
+    One scrape_details batch: the pages are fetched concurrently and parsed
+    across the worker processes. Returns the stories updated.
+    """
+    count = crawl_plan(source)["details"] if count is None else count
+    if not count or not stories:
+        return []
+    with metrics.span("details", source):
+        return scrape_details(source, [story.index for story in stories[:count]])
@@ -0,0 +1,23 @@
+import os
+import csv
+import threading
+
+
+def columns(stories):
+    # Union of keys in first-seen order, the same column order pandas used
+    seen = {}
+    for story in stories:
+        for key in story:
+            seen.setdefault(key, None)
+    return list(seen)
+
+
+def write_stories_csv(stories, path):
+    """Stream stories to `path` as CSV, one row per story; missing fields stay empty."""
+    # One temp file per writer: the GUI and the scraper processes save the same CSV
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns(stories), restval="", lineterminator=os.linesep)
+        writer.writeheader()
+        writer.writerows(stories)
+    os.replace(tmp, path)
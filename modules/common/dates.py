@@ -0,0 +1,86 @@
+import re
+import threading
+from datetime import datetime, timezone, timedelta
+
+from modules.common import metrics
+from modules.common.log import get_logger
+
+logger = get_logger(__name__)
+
+# Every paper prints Indian time; strings without an offset are read as IST
+LOCAL_TZ = timezone(timedelta(hours=5, minutes=30), "IST")
+TZ_NAMES = {"IST": "+0530", "GMT": "+0000", "UTC": "+0000"}
+
+# "Updated: ", "Published - ", "Last Updated : " and the like before the date
+LABEL = re.compile(r'^\s*(?:last\s+)?(?:updated|published|posted|modified)(?:\s+on)?\s*[:\-–|]?\s*', re.I)
+TZ_SUFFIX = re.compile(r'\s*\b(' + "|".join(TZ_NAMES) + r')\s*$')
+# Commas and the "|" some papers print between date and time count as spaces
+SPACES = re.compile(r'[\s,|]+')
+
+DATE_LAYOUTS = ("%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y")
+# Times with and without seconds, on the 24- and 12-hour clock
+TIME_LAYOUTS = ("%H:%M", "%I:%M %p", "%H:%M:%S", "%I:%M:%S %p")
+
+# Candidate layouts, tried in order until one matches; commas and "|" are
+# removed and a trailing zone name becomes an offset before parsing. "iso" and
+# "epoch" are handled without strptime.
+FORMATS = (
+    ("iso", "epoch")
+    + tuple(f"{date} {time} %z" for time in TIME_LAYOUTS for date in DATE_LAYOUTS)
+    + tuple(f"{date} {time}" for time in TIME_LAYOUTS for date in DATE_LAYOUTS)
+    + DATE_LAYOUTS
+)
+
+# (source, stage) -> the format that last matched; a source keeps one layout
+# per page type, so after the first story every later one costs one attempt
+_learned = {}
+_learn_lock = threading.Lock()
+
+
+def _clean(raw):
+    text = LABEL.sub("", raw.strip())
+    text = TZ_SUFFIX.sub(lambda m: " " + TZ_NAMES[m.group(1)], text)
+    return SPACES.sub(" ", text).strip()
+
+
+def _parse(text, fmt):
+    if fmt == "iso":
+        return datetime.fromisoformat(text)
+    if fmt == "epoch":
+        if not text.isdigit():
+            raise ValueError(text)
+        # data-time attributes are sometimes epoch milliseconds
+        value = int(text)
+        return datetime.fromtimestamp(value / 1000 if value > 10 ** 11 else value, timezone.utc)
+    return datetime.strptime(text, fmt)
+
+
+def parse_date(raw, source, stage="listing"):
+    """The moment a raw date string names, as an aware UTC datetime, or None if no format fits."""
+    if not raw:
+        return None
+    text = _clean(raw)
+    key = (source, stage)
+    learned = _learned.get(key)
+    candidates = FORMATS if learned is None else (learned,) + tuple(f for f in FORMATS if f != learned)
+    for fmt in candidates:
+        try:
+            moment = _parse(text, fmt)
+        except (ValueError, OverflowError, OSError):
+            continue
+        if fmt != learned:
+            with _learn_lock:
+                _learned[key] = fmt
+            logger.debug("%s %s dates use %r", source, stage, fmt)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=LOCAL_TZ)
+        return moment.astimezone(timezone.utc)
+    metrics.count("errors", source, stage="date")
+    logger.debug("Unrecognised %s date: %r", source, raw)
+    return None
+
+
+def utc_iso(raw, source, stage="listing"):
+    # Stored form: ISO 8601 in UTC, which sorts correctly as plain text
+    moment = parse_date(raw, source, stage)
+    return moment.isoformat(timespec="seconds") if moment else None
@@ -0,0 +1,962 @@
+import os
+import re
+import glob
+import atexit
+import json
+import time
+import shutil
+import logging
+import threading
+from functools import partial
+from html import unescape
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from modules.common import latency, metrics, parsecache, snapshots
+from modules.common.alerts import check_stories
+from modules.common.dates import utc_iso
+from modules.common.filelock import file_lock
+from modules.common.httpclient import get as http_get
+from modules.common.log import get_logger
+from modules.common.ratelimit import limits_for
+from modules.common.related import index_stories
+from modules.common.seen import SeenLedger
+from modules.common.sources import SOURCES
+from modules.common.story import load_stories, save_stories, Story
+from modules.common.topics import assign_topics
+from modules.common.urls import canonical_url, url_key
+from modules.common.workers import map_cpu
+
+logger = get_logger(__name__)
+
+# Listing fields every source shares unless its spec says otherwise
+LISTING_DEFAULTS = {"link": "a[href]", "image": "img"}
+WHITESPACE = re.compile(r'[\n\t]+')
+# Structured data blocks; found with a regex so the fast path never builds a parse tree
+JSON_LD = re.compile(r'<script[^>]*?type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>', re.I | re.S)
+JSON_LD_BYTES = re.compile(JSON_LD.pattern.encode("ascii"), re.I | re.S)
+ARTICLE_TYPES = frozenset({"NewsArticle", "Article", "ReportageNewsArticle", "AnalysisNewsArticle",
+                           "OpinionNewsArticle", "BackgroundNewsArticle"})
+# Without these the article page is parsed as well, and fills in what is missing
+JSON_LD_REQUIRED = ("headline", "paragraph", "image_url")
+# Elements without a closing tag
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                       "source", "track", "wbr"})
+# Elements whose content is text, not markup
+RAW_TEXT_TAGS = frozenset({"script", "style", "textarea", "title"})
+# Tokens of ListingScanner: a whole start or end tag, the start of one, an attribute, a selector's element name
+TAG = re.compile(r'<(/?)([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+TAG_START = re.compile(r'</?[a-zA-Z]')
+ATTRIBUTE = re.compile(r'([^\s=/>]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+ITEM_TAG = re.compile(r'[a-zA-Z][\w-]*')
+# Every downloaded image, named by its canonical URL, so an image already on
+# disk is linked into place instead of being fetched again
+IMAGE_CACHE = os.path.join("images", "cache")
+IMAGE_CACHE_DAYS = 3
+# Fields a fetched article page improves on; carried over to the next listing refresh
+DETAIL_FIELDS = ("headline", "paragraph", "date_time", "published", "image_url", "image_alt")
+# A click waits at most this long, in seconds, for its article before the stored copy is shown
+DETAIL_DEADLINE = float(os.environ.get("NEWSAPP_DETAIL_DEADLINE", 4.0))
+# A second, identical request goes out once the first has taken longer than the
+# source's recent p95 fetch time; the first answer wins. NEWSAPP_HEDGE=0 turns it off.
+HEDGE = os.environ.get("NEWSAPP_HEDGE", "1") != "0"
+HEDGE_PERCENTILE = 0.95
+# Hedge delay, in seconds, until enough fetches of a source have been timed
+HEDGE_DEFAULT = 1.5
+# Click latencies and the detail metrics reports are written off the click's
+# path: at most this often, in seconds, and once more at exit
+REPORT_INTERVAL = 5.0
+# Fields a listing page gives each story; what the parse cache keeps per story
+LISTING_FIELDS = ("headline", "paragraph", "date_time", "published", "news_url", "image_url", "image_alt")
+
+_compiled = {}
+_compile_lock = threading.Lock()
+
+
+class Field:
+    """A compiled field spec: fallback selectors plus an optional attribute."""
+
+    __slots__ = ("selectors", "attr")
+
+    def __init__(self, spec):
+        attr = None
+        if isinstance(spec, dict):
+            spec, attr = spec["select"], spec.get("attr")
+        if spec is None:
+            spec = []
+        elif isinstance(spec, str):
+            spec = [spec]
+        self.selectors = tuple(soupsieve.compile(s) for s in spec)
+        self.attr = attr
+
+    def element(self, tag):
+        for selector in self.selectors:
+            found = selector.select_one(tag)
+            if found is not None:
+                return found
+        return None
+
+    def value(self, tag, text):
+        # text() turns the element into a string; attribute fields skip it
+        element = self.element(tag)
+        if element is None:
+            return None
+        if self.attr:
+            return element.get(self.attr)
+        return text(element)
+
+
+class CompiledSource:
+    def __init__(self, code):
+        spec = SOURCES[code]
+        listing = dict(LISTING_DEFAULTS, **spec["listing"])
+        detail = spec["detail"]
+        self.code = code
+        self.spec = spec
+
+        self.items = soupsieve.compile(listing["items"])
+        self.limit = listing["limit"] or 0
+        self.link = Field(listing["link"])
+        self.image = Field(listing["image"])
+        self.headline = Field(listing["headline"])
+        self.date = Field(listing["date"])
+        self.paragraph = Field(listing["paragraph"])
+        self.collapse_whitespace = listing["collapse_whitespace"]
+        self.save_alt_text = listing["save_alt_text"]
+
+        body = detail["body"]
+        self.body_mode = body["mode"]
+        self.body = [soupsieve.compile(s) for s in ([body["select"]] if isinstance(body["select"], str) else body["select"])]
+        self.body_skip = tuple(body.get("skip", ()))
+        self.detail_image = Field(detail["image"])
+        self.detail_alt = Field(detail["image"].get("alt")) if detail["image"].get("alt") else None
+        self.detail_date = Field(detail["date"])
+        self.detail_headline = Field(detail.get("headline", "h1"))
+        self.json_ld = detail.get("json_ld", True)
+
+    def listing_text(self, element):
+        if self.collapse_whitespace:
+            return WHITESPACE.sub(' ', element.text).strip()
+        return element.text.strip()
+
+    def extract_story(self, item, idx):
+        base_url = self.spec["base_url"]
+        link_tag = self.link.element(item)
+        img = self.image.element(item)
+        date_time = self.date.value(item, self.listing_text)
+        return Story(
+            self.code, idx,
+            headline=self.headline.value(item, self.listing_text),
+            paragraph=self.paragraph.value(item, self.listing_text),
+            date_time=date_time,
+            published=utc_iso(date_time, self.code, "listing"),
+            news_url=canonical_url(urljoin(base_url, link_tag['href']), self.code) if link_tag else None,
+            image_url=canonical_url(urljoin(base_url, img['src']), self.code) if img and 'src' in img.attrs else None,
+            image_alt=img['alt'] if img and 'alt' in img.attrs else None,
+        )
+
+    def article_text(self, soup):
+        if self.body_mode == "text":
+            # Whole container text, without scripts, styles and embedded widgets
+            article_div = self.body[0].select_one(soup)
+            if article_div is None:
+                return None
+            for tag in article_div(["style", "script", "div"]):
+                tag.decompose()
+            for br in article_div.find_all("br"):
+                br.replace_with("\n")
+            return article_div.get_text(separator="\n", strip=True)
+
+        paragraphs = []
+        for selector in self.body:
+            container = selector.select_one(soup)
+            if container is None:
+                continue
+            if self.body_mode == "paragraphs":
+                paragraphs += [p.get_text(strip=True) for p in container.find_all("p")]
+            else:
+                paragraphs += [s.strip() for s in container.stripped_strings
+                               if not any(bad in s.lower() for bad in self.body_skip)]
+        return "\n\n".join(p for p in paragraphs if p.strip())
+
+    def structured_fields(self, html_doc, encoding, news_url):
+        """DETAIL_FIELDS values from the page's NewsArticle JSON-LD, without parsing the HTML.
+
+        date_time stays None: the paper's printed date is kept, and the
+        machine-readable datePublished goes to published instead.
+        """
+        pattern = JSON_LD_BYTES if isinstance(html_doc, bytes) else JSON_LD
+        for block in pattern.findall(html_doc):
+            if isinstance(block, bytes):
+                block = block.decode(encoding or "utf-8", errors="replace")
+            try:
+                data = json.loads(block)
+            except ValueError:
+                continue
+            article = next(_article_nodes(data), None)
+            if article is None:
+                continue
+            headline = _ld_text(article.get("headline"))
+            body = _ld_text(article.get("articleBody"))
+            if body:
+                lines = [line.strip() for line in body.splitlines() if line.strip()]
+                # Same layout as article_text: one line per text node, or paragraphs apart
+                body = "\n".join(lines) if self.body_mode == "text" else "\n\n".join(lines)
+            image_url, image_alt = _ld_image(article.get("image"))
+            if image_url:
+                image_url = canonical_url(urljoin(news_url, image_url), self.code)
+                # Papers use the headline as the lead image's alt text; a caption is better still
+                image_alt = image_alt or headline
+            published = article.get("datePublished")
+            published = utc_iso(published, self.code, "json_ld") if isinstance(published, str) else None
+            return {"headline": headline, "paragraph": body or None, "date_time": None,
+                    "published": published, "image_url": image_url, "image_alt": image_alt}
+        return None
+
+    def update_story(self, story, soup, news_url):
+        # Apply an article page to its listing story; returns the image URL, if any
+        headline = self.detail_headline.element(soup)
+        if headline:
+            story.headline = headline.get_text(strip=True)
+
+        paragraph_text = self.article_text(soup)
+        if paragraph_text:
+            logger.debug("Extracted full article text:\n%s", paragraph_text)
+            story.paragraph = paragraph_text
+
+        date_time = self.detail_date.value(soup, lambda e: e.get_text(strip=True))
+        if date_time:
+            story.date_time = date_time
+            story.published = utc_iso(date_time, self.code, "detail") or story.published
+
+        img_url = self.detail_image.value(soup, None)
+        if img_url:
+            img_url = canonical_url(urljoin(news_url, img_url), self.code)
+            alt_source = self.detail_alt or self.detail_image
+            img_tag = alt_source.element(soup)
+            story.image_url = img_url
+            story.image_alt = img_tag.get("alt") if img_tag else None
+        return img_url
+
+
+def _article_nodes(data):
+    # NewsArticle objects anywhere in a JSON-LD document: a list, an @graph or the top level
+    if isinstance(data, list):
+        for item in data:
+            yield from _article_nodes(item)
+    elif isinstance(data, dict):
+        kind = data.get("@type")
+        kinds = kind if isinstance(kind, list) else [kind]
+        if any(k in ARTICLE_TYPES for k in kinds if isinstance(k, str)):
+            yield data
+        yield from _article_nodes(data.get("@graph"))
+
+
+def _ld_text(value):
+    if isinstance(value, list):
+        value = next((v for v in value if isinstance(v, str)), None)
+    if not isinstance(value, str):
+        return None
+    return unescape(value).strip() or None
+
+
+def _ld_image(image):
+    # image may be a URL, an ImageObject or a list of either; the first one wins
+    if isinstance(image, list):
+        image = image[0] if image else None
+    if isinstance(image, str):
+        return image, None
+    if isinstance(image, dict):
+        url = image.get("url") or image.get("contentUrl")
+        return (url if isinstance(url, str) else None), _ld_text(image.get("caption") or image.get("description"))
+    return None, None
+
+
+def compiled(code):
+    # Selectors are compiled on first use of a source and shared afterwards
+    with _compile_lock:
+        source = _compiled.get(code)
+        if source is None:
+            source = _compiled[code] = CompiledSource(code)
+    return source
+
+
+def delete_all_images(folder):
+    for f in glob.glob(os.path.join(folder, '*.jpg')):
+        os.remove(f)
+    logger.debug("Deleted old images in %s", folder)
+
+
+_image_locks = {}
+_image_locks_lock = threading.Lock()
+
+
+def _place(cached, path):
+    # Hard link where the filesystem allows it, a copy otherwise
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    try:
+        os.link(cached, path)
+    except OSError:
+        shutil.copyfile(cached, path)
+
+
+def download_image(code, img_url, path, article, budget=None, timeout=10):
+    """Put the image at `path`, fetching it only if no earlier run or story already did."""
+    cached = os.path.join(IMAGE_CACHE, f"{url_key(img_url, code)}.jpg")
+    with _image_locks_lock:
+        lock = _image_locks.setdefault(cached, threading.Lock())
+    # Stories sharing an image wait for the first download instead of repeating it
+    with lock:
+        if os.path.exists(cached):
+            os.utime(cached)
+            metrics.count("cache_hits", code, layer="image")
+            _place(cached, path)
+            return path
+        if budget is not None and not budget.take_request():
+            return None
+        with metrics.span("image", code, article=article):
+            try:
+                response = http_get(img_url, source=code, timeout=timeout)
+                if budget is not None:
+                    budget.add_bytes(len(response.content))
+                response.raise_for_status()
+                os.makedirs(IMAGE_CACHE, exist_ok=True)
+                tmp = f"{cached}.tmp"
+                with open(tmp, 'wb') as img_file:
+                    img_file.write(response.content)
+                os.replace(tmp, cached)
+                _place(cached, path)
+                logger.debug("Downloaded: %s", path)
+                return path
+            except Exception as e:
+                metrics.count("errors", code, stage="image")
+                logger.warning("Image download failed for %s: %s", img_url, e)
+                return None
+
+
+def image_file(code, story, suffix=".jpg"):
+    # Named by the story's URL, not its list position: a save that finishes
+    # after a refresh renumbered the list still lands on its own story's image
+    key = url_key(story.news_url, code) if story.news_url else story.index
+    return os.path.join(SOURCES[code]["image_folder"], f"image_{key}{suffix}")
+
+
+def prune_image_cache(max_age_days=IMAGE_CACHE_DAYS):
+    # Cached images are touched on every use; drop the ones nobody used lately
+    cutoff = time.time() - max_age_days * 86400
+    for f in glob.glob(os.path.join(IMAGE_CACHE, "*.jpg")):
+        try:
+            if os.path.getmtime(f) < cutoff:
+                os.remove(f)
+        except OSError:
+            pass
+
+
+def detail_ledger(json_path):
+    return SeenLedger(os.path.join(os.path.dirname(json_path), "seen.json"))
+
+
+def carry_over_details(code, stories, json_path):
+    """Keep article text fetched earlier for stories that are still listed and still fresh."""
+    try:
+        previous = {s.news_url: s for s in load_stories(json_path, code) if s.news_url}
+    except (OSError, ValueError):
+        return
+    ledger = detail_ledger(json_path)
+    for story in stories:
+        old = previous.get(story.news_url)
+        if old is not None and old.topic is not None:
+            # Topics are relabelled by the next topic run; a refresh labels only new stories
+            story.topic = old.topic
+        if old is not None and ledger.fresh("detail", story.news_url, code):
+            for field in DETAIL_FIELDS:
+                value = getattr(old, field)
+                if value is not None:
+                    setattr(story, field, value)
+
+
+def raise_alerts(code, stories):
+    # Alerts never stop a refresh; a failure here is logged and the stories stay saved
+    try:
+        check_stories(code, stories)
+    except Exception as e:
+        metrics.count("errors", code, stage="alerts")
+        logger.warning("Alert matching failed for %s: %s", code, e)
+
+
+def label_topics(code, stories):
+    try:
+        count = assign_topics(stories)
+    except ImportError:
+        # numpy or scipy is not installed; stories wait for a topic run that can label them
+        return
+    except Exception as e:
+        metrics.count("errors", code, stage="topics")
+        logger.warning("Could not label %s stories with topics: %s", code, e)
+        return
+    if count:
+        logger.info("Labelled %d new %s stories with topics", count, code)
+
+
+def update_related(code, stories):
+    try:
+        index_stories(code, stories)
+    except ImportError:
+        # numpy is not installed; related articles are simply not offered
+        pass
+    except Exception as e:
+        metrics.count("errors", code, stage="related")
+        logger.warning("Could not index %s stories for related articles: %s", code, e)
+
+
+def fetch_listing(code, url=None, path=None):
+    """Download the section page of a source to its html_path."""
+    spec = SOURCES[code]
+    url = url or spec["section"]
+    path = path or spec["html_path"]
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with metrics.span("fetch", code):
+            r = http_get(url, source=code)
+        r.raise_for_status()
+        snapshots.save(code, url, "listing", r.content, r.encoding)
+        with metrics.span("decode", code):
+            text = r.text
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        logger.info("Fetched and saved content from %s to %s", url, path)
+    except Exception as e:
+        metrics.count("errors", code, stage="fetch")
+        logger.error("Error fetching %s: %s", url, e)
+
+
+class ListingScanner:
+    """Counts a source's listing items as its section page arrives in pieces, without building a tree.
+
+    A light tokenizer: it tracks open tags and checks start tags against the
+    item selector, skipping comments and script/style text. feed() returns True
+    once `want` items have closed; text() is then the page up to the end of the
+    last of them, which parse_listing reads as usual.
+    """
+
+    def __init__(self, code, want):
+        self.items = compiled(code).items
+        selector = SOURCES[code]["listing"]["items"]
+        # Only tags of the selector's element type can be items; None checks every tag
+        name = ITEM_TAG.match(selector)
+        self.name = name.group(0).lower() if name and "," not in selector else None
+        self.want = want
+        self.found = 0
+        self.open = []
+        self.parts = []
+        self.buffer = ""
+        self.offset = 0
+        self.raw_text = None
+        self.end = None
+
+    def feed(self, data):
+        if self.end is not None:
+            return True
+        self.parts.append(data)
+        buffer = self.buffer + data
+        pos = 0
+        while self.end is None:
+            if self.raw_text:
+                close = self.raw_text.search(buffer, pos)
+                if close is None:
+                    # Keep enough of the tail for a closing tag split across pieces
+                    pos = max(pos, len(buffer) - 16)
+                    break
+                self.raw_text = None
+                pos = close.start()
+            lt = buffer.find("<", pos)
+            if lt < 0:
+                pos = len(buffer)
+                break
+            if buffer.startswith("<!--", lt):
+                close = buffer.find("-->", lt + 4)
+                if close < 0:
+                    pos = lt
+                    break
+                pos = close + 3
+                continue
+            tag = TAG.match(buffer, lt)
+            if tag is None:
+                if TAG_START.match(buffer, lt) or len(buffer) - lt < 4:
+                    # A tag or comment cut off at the end of this piece
+                    pos = lt
+                    break
+                pos = lt + 1
+                continue
+            pos = tag.end()
+            self._tag(tag, self.offset + pos)
+        self.buffer = buffer[pos:]
+        self.offset += pos
+        return self.end is not None
+
+    def _tag(self, tag, end):
+        closing, name, attrs = tag.group(1), tag.group(2).lower(), tag.group(3)
+        if closing:
+            # Closes the innermost open element of that name and whatever is still open inside it
+            for i in range(len(self.open) - 1, -1, -1):
+                if self.open[i][0] == name:
+                    closed = self.open[i:]
+                    del self.open[i:]
+                    for _, item in reversed(closed):
+                        if item:
+                            self._closed(end)
+                    return
+            return
+        item = (self.name is None or name == self.name) and self._is_item(name, attrs)
+        if name in VOID_TAGS or attrs.rstrip().endswith("/"):
+            if item:
+                self._closed(end)
+            return
+        self.open.append((name, item))
+        if name in RAW_TEXT_TAGS:
+            self.raw_text = re.compile(rf"</{name}\b", re.I)
+
+    def _is_item(self, name, attrs):
+        # The item selectors are simple (tag, class, attribute), so the start tag alone decides
+        values = {key.lower(): unescape(value.strip("\"'")) if value else ""
+                  for key, value in ATTRIBUTE.findall(attrs)}
+        return self.items.match(Tag(name=name, attrs=values))
+
+    def _closed(self, end):
+        self.found += 1
+        if self.found >= self.want and self.end is None:
+            self.end = end
+
+    def text(self):
+        text = "".join(self.parts)
+        return text if self.end is None else text[:self.end]
+
+
+def parse_listing(code, html_doc, first_index=1):
+    """Stories of one section page, in page order, numbered from first_index."""
+    cached = parsecache.get(code, "listing", html_doc)
+    if cached is not None:
+        metrics.count("cache_hits", code, layer="parse")
+        return [Story(code, idx, **dict(zip(LISTING_FIELDS, values)))
+                for idx, values in enumerate(cached, start=first_index)]
+    source = compiled(code)
+    with metrics.span("parse", code):
+        soup = BeautifulSoup(html_doc, 'html.parser')
+    stories = []
+    for idx, item in enumerate(source.items.select(soup, limit=source.limit), start=first_index):
+        with metrics.span("extract", code, article=idx):
+            stories.append(source.extract_story(item, idx))
+    parsecache.put(code, "listing", html_doc,
+                   [[getattr(story, field) for field in LISTING_FIELDS] for story in stories])
+    return stories
+
+
+def store_listing(code, stories, budget=None):
+    """Download images and alt text for freshly scraped stories and write JSON and CSV."""
+    spec = SOURCES[code]
+    source = compiled(code)
+    image_folder = spec["image_folder"]
+    os.makedirs(image_folder, exist_ok=True)
+    delete_all_images(image_folder)
+    os.makedirs(os.path.dirname(spec["json"]), exist_ok=True)
+    carry_over_details(code, stories, spec["json"])
+
+    downloads = []
+    for story in stories:
+        if source.save_alt_text and story.image_alt:
+            alt_text_filename = image_file(code, story, "_alt.txt")
+            with open(alt_text_filename, 'w', encoding='utf-8') as alt_file:
+                alt_file.write(story.image_alt)
+            logger.debug("Saved alt text for image %s to %s", story.index, alt_text_filename)
+        if story.image_url:
+            downloads.append(story)
+
+    # Images go out in parallel, up to the per-host concurrency of the source
+    def fetch_image(story):
+        return download_image(code, story.image_url, image_file(code, story), story.index, budget)
+
+    with ThreadPoolExecutor(max_workers=limits_for(code)["concurrency"]) as pool:
+        for story, path in zip(downloads, pool.map(fetch_image, downloads)):
+            story.image_path = path
+    prune_image_cache()
+
+    # Full per-story dump only when asked for; json.dumps is skipped otherwise
+    if logger.isEnabledFor(logging.DEBUG):
+        for story in stories:
+            logger.debug("%s", json.dumps(story.to_dict(), indent=2, ensure_ascii=False))
+
+    with metrics.span("topics", code):
+        label_topics(code, stories)
+    with metrics.span("persist", code), stories_lock(spec["json"]):
+        # Again under the lock: a click or prefetch may have saved an article since
+        # the first pass, and the new listing keeps it rather than write over it
+        carry_over_details(code, stories, spec["json"])
+        save_stories(stories, spec["json"], spec["csv"])
+    logger.info("Saved to %s and %s", spec["json"], spec["csv"])
+    raise_alerts(code, stories)
+    update_related(code, stories)
+    return stories
+
+
+def scrape_listing(code, html_path=None):
+    """Extract every story of a saved section page, download images and write JSON and CSV."""
+    with open(html_path or SOURCES[code]["html_path"], "r", encoding='utf-8') as f:
+        html_doc = f.read()
+    return store_listing(code, parse_listing(code, html_doc))
+
+
+def fetch_article(code, url, index=None, raw=False, budget=None):
+    # raw=True returns (bytes, declared encoding) for the parse workers to decode
+    if budget is not None and not budget.take_request():
+        return None
+    try:
+        with metrics.span("fetch", code, article=index):
+            response = http_get(url, source=code, timeout=10)
+            if budget is not None:
+                budget.add_bytes(len(response.content))
+            response.raise_for_status()
+        snapshots.save(code, url, "article", response.content, response.encoding)
+        if raw:
+            return response.content, response.encoding
+        with metrics.span("decode", code, article=index):
+            return response.text
+    except Exception as e:
+        metrics.count("errors", code, stage="fetch")
+        logger.error("Failed to fetch %s: %s", url, e)
+        return None
+
+
+def _fetch_async(code, url, index):
+    # One article request on a daemon thread, so an abandoned one never holds up exit
+    future = Future()
+
+    def run():
+        start = time.perf_counter()
+        html = fetch_article(code, url, index)
+        if html is not None:
+            latency.observe("fetch", code, time.perf_counter() - start)
+        future.set_result(html)
+
+    threading.Thread(target=run, name="detail-fetch", daemon=True).start()
+    return future
+
+
+def fetch_within(code, url, index, deadline):
+    """The article page, or None if every attempt failed or time.monotonic() reached deadline.
+
+    A hedge request goes out when the first outlasts the source's p95 fetch
+    time, or half the time left if that is sooner, so there is room for it to
+    answer; requests still running at the deadline finish unobserved.
+    """
+    pending = {_fetch_async(code, url, index)}
+    hedge_at = None
+    if HEDGE:
+        now = time.monotonic()
+        delay = latency.percentile("fetch", code, HEDGE_PERCENTILE, HEDGE_DEFAULT)
+        hedge_at = now + min(delay, (deadline - now) / 2)
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            metrics.count("deadline_exceeded", code, stage="detail")
+            logger.warning("Article %s not fetched within the deadline", index)
+            return None
+        until = deadline if hedge_at is None else min(deadline, hedge_at)
+        done, pending = wait(pending, timeout=until - now, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.result() is not None:
+                return future.result()
+        if hedge_at is not None and time.monotonic() >= hedge_at:
+            hedge_at = None
+            if pending:
+                metrics.count("hedged", code)
+                pending.add(_fetch_async(code, url, index))
+    return None
+
+
+def stored_fallback(code, story, json_path, csv_path):
+    # The stored story, with its text filled from the newest archived copy of the page if there is one
+    metrics.count("stale_served", code, layer="detail")
+    entry = snapshots.latest(code, story.news_url)
+    if entry is None:
+        return story
+    try:
+        content, encoding = snapshots.read(entry)
+        apply_record(story, extract_record(code, (story.news_url, content, encoding)))
+    except (OSError, ValueError, ImportError) as e:
+        logger.warning("Could not read the archived copy of %s: %s", story.news_url, e)
+        return story
+    if not persist_stories(code, [story], json_path, csv_path):
+        logger.info("Article %s is no longer listed; not saved", story.index)
+    logger.info("Showing the copy of article %s fetched %s", story.index, entry["fetched"])
+    return story
+
+
+def stories_lock(json_path):
+    """The lock every writer of one stories file saves it under, across threads and processes."""
+    return file_lock(f"{os.path.abspath(json_path)}.lock")
+
+
+def listing_urls(stories):
+    # A listing's generation: its story URLs in order. A refresh that changes the list changes it.
+    return tuple(story.news_url for story in stories)
+
+
+def persist_stories(code, updated, json_path, csv_path, fetched=False, listing=None):
+    """Save fetched stories into the stored listing by News URL; returns those saved.
+
+    Clicks, prefetches, batch fetches and refreshes (in the GUI or a scraper
+    process) write the same file, so the stories (and the ledger) are re-read
+    under the stories lock and each update replaces only the story with its
+    URL, taking that story's current index. Updates whose URL a refresh has
+    since dropped are not saved. With `listing`, nothing is saved unless the
+    stored list still has that generation (listing_urls).
+    """
+    by_url = {story.news_url: story for story in updated if story.news_url}
+    with stories_lock(json_path):
+        stories = load_stories(json_path, code)
+        if listing is not None and listing_urls(stories) != listing:
+            return []
+        saved = []
+        for position, story in enumerate(stories):
+            update = by_url.get(story.news_url)
+            if update is not None:
+                update.index = story.index
+                stories[position] = update
+                saved.append(update)
+        if not saved:
+            return saved
+        save_stories(stories, json_path, csv_path)
+        if fetched:
+            ledger = detail_ledger(json_path)
+            for story in saved:
+                ledger.mark("detail", story.news_url, code)
+            ledger.save()
+    return saved
+
+
+def extract_record(code, page):
+    """Parse one (news_url, html, encoding) article page into its DETAIL_FIELDS values.
+
+    Runs in the parse workers, so it takes raw bytes and returns a plain tuple.
+    Undeclared encodings are left to BeautifulSoup to detect. The page's
+    NewsArticle JSON-LD is tried first; the HTML is only parsed when it lacks a
+    headline, body or image. A page parsed before under the same extraction
+    rules is answered from the parse cache.
+    """
+    news_url, html, encoding = page
+    # The image URL is resolved against the article URL, so it is part of the key
+    key = f"{news_url}\n".encode("utf-8") + (html if isinstance(html, bytes) else html.encode("utf-8"))
+    cached = parsecache.get(code, "article", key)
+    if cached is not None:
+        metrics.count("cache_hits", code, layer="parse")
+        return cached
+    source = compiled(code)
+    fields = source.structured_fields(html, encoding, news_url) if source.json_ld else None
+    if fields is not None and all(fields[field] for field in JSON_LD_REQUIRED):
+        metrics.count("extract_path", code, path="json_ld")
+        record = tuple(fields[field] for field in DETAIL_FIELDS)
+    else:
+        metrics.count("extract_path", code, path="dom")
+        if isinstance(html, bytes) and encoding:
+            html = html.decode(encoding, errors="replace")
+        with metrics.span("parse", code):
+            soup = BeautifulSoup(html, "html.parser")
+        story = Story(code, None)
+        source.update_story(story, soup, news_url)
+        # Structured data still fills what the page markup did not give
+        record = tuple(getattr(story, field) if getattr(story, field) is not None or fields is None else fields[field]
+                       for field in DETAIL_FIELDS)
+    parsecache.put(code, "article", key, record)
+    return record
+
+
+def apply_record(story, record):
+    # Same effect as update_story on the listing story; returns the article image URL
+    values = dict(zip(DETAIL_FIELDS, record))
+    for field, value in values.items():
+        if value is not None:
+            setattr(story, field, value)
+    if values["image_url"]:
+        story.image_alt = values["image_alt"]
+    return values["image_url"]
+
+
+def scrape_details(code, indexes=None, json_path=None, csv_path=None):
+    """Fill in many stories of a source at once: fetch concurrently, parse across processes, save once.
+
+    indexes=None takes every stored story. Stories fetched within the detail
+    TTL are skipped. Returns the stories that were updated.
+    """
+    spec = SOURCES[code]
+    json_path = json_path or spec["json"]
+    csv_path = csv_path or spec["csv"]
+    stories = load_stories(json_path, code)
+    ledger = detail_ledger(json_path)
+    wanted = None if indexes is None else set(indexes)
+    targets = []
+    for story in stories:
+        if wanted is not None and story.index not in wanted:
+            continue
+        if not (story.news_url or "").startswith("http"):
+            continue
+        if ledger.fresh("detail", story.news_url, code):
+            metrics.count("cache_hits", code, layer="detail")
+            continue
+        targets.append(story)
+    if not targets:
+        return []
+
+    with ThreadPoolExecutor(max_workers=limits_for(code)["concurrency"]) as pool:
+        pages = list(pool.map(lambda s: fetch_article(code, s.news_url, s.index, raw=True), targets))
+    fetched = [(story, page) for story, page in zip(targets, pages) if page is not None]
+
+    with metrics.span("extract", code):
+        records = map_cpu(partial(extract_record, code),
+                          [(story.news_url, content, encoding) for story, (content, encoding) in fetched])
+
+    def finish(pair):
+        story, record = pair
+        img_url = apply_record(story, record)
+        if img_url:
+            story.image_path = download_image(code, img_url, image_file(code, story), story.index) or story.image_path
+        return story
+
+    with ThreadPoolExecutor(max_workers=limits_for(code)["concurrency"]) as pool:
+        updated = list(pool.map(finish, zip([story for story, _ in fetched], records)))
+
+    with metrics.span("persist", code):
+        updated = persist_stories(code, updated, json_path, csv_path, fetched=True)
+    logger.info("Updated %d of %d %s stories", len(updated), len(targets), code)
+    raise_alerts(code, updated)
+    update_related(code, updated)
+    return updated
+
+
+def scrape_detail(code, index, json_path=None, csv_path=None, deadline=DETAIL_DEADLINE, wait=None):
+    """Fetch the article behind one listing story and store its full text, date and image.
+
+    If the article has not arrived within `deadline` seconds (None waits for
+    the request timeout), the stored story is returned instead, filled from the
+    snapshot archive when an earlier copy of the page is there. `wait`, if
+    given, is called first with the seconds left (None without a deadline):
+    a prefetch of the story in flight is waited for within the same deadline.
+    The time of every call is recorded, and its percentiles reported, as
+    "click" latency.
+    """
+    start = time.perf_counter()
+    until = time.monotonic() + deadline if deadline else None
+    try:
+        if wait is not None:
+            wait(max(0.0, until - time.monotonic()) if until else None)
+        return _scrape_detail(code, index, json_path, csv_path, until)
+    finally:
+        latency.observe("click", code, time.perf_counter() - start)
+        _report_later(code)
+
+
+_reports_lock = threading.Lock()
+# source -> working directory of its pending detail report
+_reports_due = {}
+_reports_timer = None
+
+
+def _report_later(code):
+    global _reports_timer
+    with _reports_lock:
+        # Absolute, so a flush after a chdir (the benchmark sandboxes) writes where the click ran
+        _reports_due[code] = os.getcwd()
+        if _reports_timer is None:
+            _reports_timer = threading.Timer(REPORT_INTERVAL, flush_reports)
+            _reports_timer.daemon = True
+            _reports_timer.start()
+
+
+def flush_reports():
+    """Write the click latencies and detail metrics reports still pending."""
+    global _reports_timer
+    with _reports_lock:
+        due = dict(_reports_due)
+        _reports_due.clear()
+        if _reports_timer is not None:
+            _reports_timer.cancel()
+            _reports_timer = None
+    for base_dir in set(due.values()):
+        latency.save(base_dir)
+    for code, base_dir in due.items():
+        metrics.write_report(f"{code}_detail", os.path.join(base_dir, metrics.METRICS_DIR))
+
+
+atexit.register(flush_reports)
+
+
+def prefetch_detail(code, index, budget, json_path=None, csv_path=None, listing=None):
+    """scrape_detail ahead of a likely click: no deadline, no stored fallback, and
+    article and image requests charged to `budget`. None if the article could not be
+    fetched, or if the stored list is no longer the `listing` generation it was asked for."""
+    return _scrape_detail(code, index, json_path, csv_path, None, budget, listing)
+
+
+def _scrape_detail(code, index, json_path, csv_path, deadline, budget=None, listing=None):
+    spec = SOURCES[code]
+    json_path = json_path or spec["json"]
+    csv_path = csv_path or spec["csv"]
+
+    stories = load_stories(json_path, code)
+    if listing is not None and listing_urls(stories) != listing:
+        logger.info("%s list was refreshed; skipping article %s", code, index)
+        return None
+    story = next((s for s in stories if s.index == index), None)
+    if story is None:
+        logger.error("No story found for index %s", index)
+        return
+
+    news_url = story.news_url or ""
+    if not news_url.startswith("http"):
+        logger.error("Invalid News URL for index %s", index)
+        return
+
+    ledger = detail_ledger(json_path)
+    if ledger.fresh("detail", news_url, code):
+        # Fetched recently, by an earlier click or carried over by the last refresh
+        metrics.count("cache_hits", code, layer="detail")
+        logger.info("Article %s was fetched recently; using the stored copy", index)
+        return story
+
+    if deadline and time.monotonic() >= deadline:
+        # Spent waiting for a prefetch of the story, which is still running
+        metrics.count("deadline_exceeded", code, stage="detail")
+        html = None
+    elif deadline:
+        html = fetch_within(code, news_url, index, deadline)
+    else:
+        html = fetch_article(code, news_url, index, budget=budget)
+    if html is None:
+        return None if budget is not None else stored_fallback(code, story, json_path, csv_path)
+
+    # An article page seen before comes back from the parse cache unparsed
+    with metrics.span("extract", code, article=index):
+        img_url = apply_record(story, extract_record(code, (news_url, html, None)))
+
+    # The article image gets what is left of the deadline; past it the listing image stays
+    timeout = 10 if deadline is None else min(10, deadline - time.monotonic())
+    if img_url and timeout > 0:
+        # Overwrite the listing image so the GUI keeps using the same path
+        story.image_path = download_image(code, img_url, image_file(code, story), index, budget,
+                                          timeout=timeout) or story.image_path
+
+    with metrics.span("persist", code, article=index):
+        saved = persist_stories(code, [story], json_path, csv_path, fetched=True, listing=listing)
+    if not saved:
+        # A refresh dropped the story, or renumbered the list a prefetch was for
+        logger.info("%s article %s is no longer in the stored list; not saved", code, index)
+        return None if budget is not None else story
+    logger.info("Updated story at index %s in JSON and CSV.", story.index)
+    # The full text may mention terms the listing teaser did not
+    raise_alerts(code, [story])
+    update_related(code, [story])
+    return story
@@ -0,0 +1,84 @@
+import os
+import requests
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from modules.common import metrics
+from modules.common.log import get_logger
+from modules.common.ratelimit import limiter_for, queue_delay_stats
+
+logger = get_logger(__name__)
+
+# One pooled session per process so repeated calls reuse connections
+session = requests.Session()
+
+
+def resolve_url(url, source=None):
+    # NEWSAPP_BASE_URL (or NEWSAPP_BASE_URL_<source>) points fetches at a
+    # stand-in server such as testserver/server.py, which receives the
+    # original host as the first path segment.
+    base = os.environ.get(f"NEWSAPP_BASE_URL_{source}") if source else None
+    base = base or os.environ.get("NEWSAPP_BASE_URL")
+    if not base:
+        return url
+    parts = urlsplit(url)
+    resolved = f"{base.rstrip('/')}/{parts.netloc}{parts.path or '/'}"
+    return f"{resolved}?{parts.query}" if parts.query else resolved
+
+
+def get(url, source=None, **kwargs):
+    # Every HTTP call in modules/* goes through here (or stream() below) so the
+    # per-host rate limit and concurrency cap apply no matter who is fetching.
+    with limiter_for(url, source).slot():
+        response = _send(url, source, **kwargs)
+        metrics.count("bytes", source, value=len(response.content))
+    return response
+
+
+@contextmanager
+def stream(url, source=None, **kwargs):
+    """get() with stream=True, as a context manager yielding the response.
+
+    The host's concurrency slot is held until the caller has read what it
+    wants and the response is closed, so streamed bodies count against the
+    cap like any other download. The caller counts the bytes it reads.
+    """
+    with limiter_for(url, source).slot():
+        response = _send(url, source, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+
+def _send(url, source, **kwargs):
+    try:
+        response = session.get(resolve_url(url, source), **kwargs)
+    except requests.RequestException:
+        metrics.count("errors", source, stage="http")
+        raise
+    if response.status_code == 304:
+        metrics.count("cache_hits", source, layer="http")
+    elif response.status_code >= 400:
+        metrics.count("errors", source, stage="http", status=response.status_code)
+    return response
+
+
+def preconnect(url, source=None, timeout=5):
+    """Resolve, connect and (for https) handshake with url's host, leaving the connection pooled.
+
+    A HEAD request for the host root: no body, and whatever the status the
+    connection goes back to the session's pool for the next real request.
+    """
+    parts = urlsplit(url)
+    root = f"{parts.scheme}://{parts.netloc}/"
+    with limiter_for(root, source).slot():
+        response = session.head(resolve_url(root, source), timeout=timeout, allow_redirects=False)
+    response.close()
+    return response.status_code
+
+
+def log_queue_delay_report():
+    for host, stats in queue_delay_stats().items():
+        logger.info("%s: %s requests, queue delay avg %ss max %ss", host, stats["requests"],
+                    stats["queue_delay_avg_s"], stats["queue_delay_max_s"])
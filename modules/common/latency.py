@@ -0,0 +1,81 @@
+import os
+import json
+import math
+import threading
+
+from modules.common.log import get_logger
+
+logger = get_logger(__name__)
+
+# Recent latencies per kind ("fetch": one article request, "click": a whole
+# detail scrape as the GUI waits for it) and source, kept across runs so the
+# hedge delay and the reported percentiles do not start from nothing.
+LATENCY_FILE = os.path.join("files", "latency.json")
+WINDOW = 500
+# Fewer samples than this give no percentile; callers use their default
+MIN_SAMPLES = 20
+
+_lock = threading.Lock()
+_samples = None
+
+
+def _load():
+    global _samples
+    if _samples is None:
+        try:
+            with open(LATENCY_FILE, "r", encoding="utf-8") as f:
+                _samples = json.load(f)
+        except (OSError, ValueError):
+            _samples = {}
+    return _samples
+
+
+def observe(kind, source, seconds):
+    with _lock:
+        window = _load().setdefault(kind, {}).setdefault(source, [])
+        window.append(round(seconds, 4))
+        del window[:-WINDOW]
+
+
+def percentile(kind, source, p, default=None):
+    """The p-quantile (0..1) of recent latencies, or default while there are too few."""
+    with _lock:
+        window = sorted(_load().get(kind, {}).get(source, ()))
+    if len(window) < MIN_SAMPLES:
+        return default
+    return _rank(window, p)
+
+
+def _rank(window, p):
+    # Nearest-rank quantile of a sorted list
+    return window[max(0, math.ceil(len(window) * p) - 1)]
+
+
+def latency_stats():
+    # {kind: {source: count, p50/p95/p99/max in seconds}} for metrics reports
+    with _lock:
+        samples = {kind: {source: sorted(window) for source, window in sources.items()}
+                   for kind, sources in _load().items()}
+    stats = {}
+    for kind, sources in samples.items():
+        for source, window in sources.items():
+            if window:
+                stats.setdefault(kind, {})[source] = {
+                    "count": len(window), "p50_s": _rank(window, 0.5), "p95_s": _rank(window, 0.95),
+                    "p99_s": _rank(window, 0.99), "max_s": window[-1],
+                }
+    return stats
+
+
+def save(base_dir="."):
+    path = os.path.join(base_dir, LATENCY_FILE)
+    with _lock:
+        data = json.dumps(_load())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not save %s: %s", path, e)
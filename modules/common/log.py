@@ -0,0 +1,44 @@
+import os
+import sys
+import queue
+import atexit
+import threading
+import logging
+import logging.handlers
+
+# WARNING keeps refreshes quiet; NEWSAPP_LOG_LEVEL=INFO shows progress and
+# NEWSAPP_LOG_LEVEL=DEBUG adds per-story and full-article dumps.
+DEFAULT_LEVEL = "WARNING"
+FORMAT = "[%(levelname)s] %(message)s"
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def _setup():
+    global _listener
+    root = logging.getLogger("newsapp")
+    level = os.environ.get("NEWSAPP_LOG_LEVEL", DEFAULT_LEVEL).upper()
+    root.setLevel(getattr(logging, level, logging.WARNING))
+    root.propagate = False
+
+    # Callers only enqueue records; formatting and writing happen on the
+    # listener thread so a slow console never stalls a scrape.
+    records = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter(FORMAT))
+    _listener = logging.handlers.QueueListener(records, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    with _setup_lock:
+        if _listener is None:
+            _setup()
+    return logging.getLogger(f"newsapp.{name}")
+
+
+def set_level(level):
+    get_logger("log").parent.setLevel(level)
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+from modules.common.latency import latency_stats
+from modules.common.log import get_logger
+from modules.common.ratelimit import queue_delay_stats
+
+logger = get_logger(__name__)
+
+# Where write_report puts <run>.prom and <run>.json
+METRICS_DIR = os.environ.get("NEWSAPP_METRICS_DIR", "metrics")
+# Per-article spans kept for the JSON summary; aggregates are always complete
+MAX_ARTICLE_SPANS = 2000
+
+_lock = threading.Lock()
+_started = time.time()
+_stages = {}
+_counters = {}
+_article_spans = []
+
+
+@contextmanager
+def span(stage, source, article=None):
+    # Time one pipeline stage (fetch, decode, parse, extract, image, persist)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, source, time.perf_counter() - start, article)
+
+
+def record(stage, source, seconds, article=None):
+    with _lock:
+        agg = _stages.setdefault((source, stage), {"count": 0, "total_s": 0.0, "max_s": 0.0})
+        agg["count"] += 1
+        agg["total_s"] += seconds
+        agg["max_s"] = max(agg["max_s"], seconds)
+        if article is not None and len(_article_spans) < MAX_ARTICLE_SPANS:
+            _article_spans.append({"source": source, "article": article, "stage": stage,
+                                   "seconds": round(seconds, 6)})
+
+
+def count(name, source, value=1, **labels):
+    # Counters such as bytes, cache_hits and errors, optionally split by label
+    key = (name, source, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def summary(run):
+    with _lock:
+        stages = {}
+        for (source, stage), agg in _stages.items():
+            stages.setdefault(source, {})[stage] = {
+                "count": agg["count"],
+                "total_s": round(agg["total_s"], 6),
+                "avg_s": round(agg["total_s"] / agg["count"], 6),
+                "max_s": round(agg["max_s"], 6),
+            }
+        counters = [
+            {"name": name, "source": source, "labels": dict(labels), "value": value}
+            for (name, source, labels), value in _counters.items()
+        ]
+        articles = list(_article_spans)
+    return {
+        "run": run,
+        "started": _started,
+        "finished": time.time(),
+        "duration_s": round(time.time() - _started, 3),
+        "stages": stages,
+        "counters": counters,
+        "queue_delay": queue_delay_stats(),
+        "latency": latency_stats(),
+        "articles": articles,
+    }
+
+
+def _label_text(labels):
+    # Exposition-format escaping; a label with no value (e.g. source=None) is left out
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels if v is not None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _by_name(item):
+    # Sort key for {source: ...} items, where a source may be None
+    return str(item[0])
+
+
+def prometheus_text(data):
+    lines = [
+        "# HELP newsapp_stage_seconds Time spent in each scrape pipeline stage.",
+        "# TYPE newsapp_stage_seconds summary",
+    ]
+    for source, stages in sorted(data["stages"].items(), key=_by_name):
+        for stage, agg in sorted(stages.items()):
+            labels = _label_text([("source", source), ("stage", stage)])
+            lines.append(f"newsapp_stage_seconds_sum{{{labels}}} {agg['total_s']}")
+            lines.append(f"newsapp_stage_seconds_count{{{labels}}} {agg['count']}")
+    lines += [
+        "# HELP newsapp_stage_seconds_max Slowest single run of each stage.",
+        "# TYPE newsapp_stage_seconds_max gauge",
+    ]
+    for source, stages in sorted(data["stages"].items(), key=_by_name):
+        for stage, agg in sorted(stages.items()):
+            labels = _label_text([("source", source), ("stage", stage)])
+            lines.append(f"newsapp_stage_seconds_max{{{labels}}} {agg['max_s']}")
+
+    names = sorted({c["name"] for c in data["counters"]})
+    for name in names:
+        lines.append(f"# TYPE newsapp_{name}_total counter")
+        for c in data["counters"]:
+            if c["name"] == name:
+                labels = _label_text([("source", c["source"])] + sorted(c["labels"].items()))
+                lines.append(f"newsapp_{name}_total{{{labels}}} {c['value']}")
+
+    lines += [
+        "# HELP newsapp_queue_delay_seconds Time spent waiting for the per-host rate limiter.",
+        "# TYPE newsapp_queue_delay_seconds summary",
+    ]
+    for host, stats in sorted(data["queue_delay"].items()):
+        labels = _label_text([("host", host)])
+        lines.append(f"newsapp_queue_delay_seconds_sum{{{labels}}} {stats['queue_delay_total_s']}")
+        lines.append(f"newsapp_queue_delay_seconds_count{{{labels}}} {stats['requests']}")
+
+    lines += [
+        "# HELP newsapp_latency_seconds Recent article fetch and detail click latency, over runs.",
+        "# TYPE newsapp_latency_seconds summary",
+    ]
+    for kind, sources in sorted(data["latency"].items()):
+        for source, stats in sorted(sources.items()):
+            for quantile, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+                labels = _label_text([("kind", kind), ("source", source), ("quantile", quantile)])
+                lines.append(f"newsapp_latency_seconds{{{labels}}} {stats[key]}")
+            labels = _label_text([("kind", kind), ("source", source)])
+            lines.append(f"newsapp_latency_seconds_count{{{labels}}} {stats['count']}")
+
+    lines += [
+        "# TYPE newsapp_last_run_timestamp_seconds gauge",
+        f'newsapp_last_run_timestamp_seconds{{{_label_text([("run", data["run"])])}}} {round(data["finished"], 3)}',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    # Write then rename so a collector never reads a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_report(run, folder=None):
+    folder = folder or METRICS_DIR
+    try:
+        os.makedirs(folder, exist_ok=True)
+        data = summary(run)
+        _write_atomic(os.path.join(folder, f"{run}.prom"), prometheus_text(data))
+        _write_atomic(os.path.join(folder, f"{run}.json"), json.dumps(data, indent=2))
+    except OSError as e:
+        logger.warning("Could not write metrics for %s: %s", run, e)
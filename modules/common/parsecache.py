@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+from modules.common.log import get_logger
+from modules.common.sources import SOURCES
+
+logger = get_logger(__name__)
+
+# What the extractors made of a page, keyed by a hash of its raw HTML and of the
+# source's extraction rules. A section page that comes back byte-identical, or an
+# article clicked again, is not parsed a second time. NEWSAPP_PARSE_CACHE=0 turns it off.
+CACHE_DIR = os.path.join("files", "parsed")
+ENABLED = os.environ.get("NEWSAPP_PARSE_CACHE", "1") != "0"
+# Bump when the extraction code in engine.py changes what it returns for a page;
+# changes to a source's selectors in sources.py are picked up by themselves
+EXTRACTOR_VERSION = 3
+# Spec entries that decide what a page extracts to
+RULE_KEYS = ("base_url", "canonical", "listing", "detail")
+# Results kept in memory per process; the rest are read back from disk
+MEMORY_ENTRIES = 512
+CACHE_DAYS = 3
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_versions = {}
+_pruned = set()
+
+
+def rules_version(code):
+    """Short hash of the extractor version and the extraction rules of one source."""
+    version = _versions.get(code)
+    if version is None:
+        rules = {key: SOURCES[code].get(key) for key in RULE_KEYS}
+        blob = json.dumps([EXTRACTOR_VERSION, rules], sort_keys=True, default=str)
+        version = _versions[code] = hashlib.blake2b(blob.encode("utf-8"), digest_size=6).hexdigest()
+    return version
+
+
+def _digest(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8", errors="surrogatepass")
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _path(code, kind, digest, base_dir):
+    return os.path.join(base_dir, CACHE_DIR, code, rules_version(code), f"{kind}-{digest}.json")
+
+
+def get(code, kind, content, base_dir="."):
+    """The cached result for a page (kind "listing" or "article"), or None."""
+    if not ENABLED or not content:
+        return None
+    path = _path(code, kind, _digest(content), base_dir)
+    key = os.path.abspath(path)
+    with _lock:
+        value = _memory.get(key)
+        if value is not None:
+            _memory.move_to_end(key)
+            return value
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = _freeze(json.load(f))
+    except (OSError, ValueError):
+        return None
+    _remember(key, value)
+    return value
+
+
+def put(code, kind, content, value, base_dir="."):
+    # Never raises: a page that cannot be cached is simply parsed again next time
+    if not ENABLED or not content:
+        return
+    path = _path(code, kind, _digest(content), base_dir)
+    _remember(os.path.abspath(path), _freeze(value))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not cache parsed %s page of %s: %s", kind, code, e)
+        return
+    if (code, base_dir) not in _pruned:
+        _pruned.add((code, base_dir))
+        prune(code, base_dir)
+
+
+def _freeze(value):
+    # Tuples all the way down, so callers cannot change a cached result in place
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _remember(key, value):
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def prune(code, base_dir=".", max_age_days=CACHE_DAYS):
+    """Drop results made under older rules of a source, and ones written more than max_age_days ago."""
+    folder = os.path.join(base_dir, CACHE_DIR, code)
+    current = rules_version(code)
+    cutoff = time.time() - max_age_days * 86400
+    try:
+        versions = os.listdir(folder)
+    except OSError:
+        return
+    for name in versions:
+        if name != current:
+            shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+    try:
+        with os.scandir(os.path.join(folder, current)) as found:
+            for entry in found:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+    except OSError:
+        pass
@@ -0,0 +1,117 @@
+import os
+import heapq
+import itertools
+import threading
+
+from modules.common import metrics
+from modules.common.crawl import Budget
+from modules.common.engine import DETAIL_DEADLINE, listing_urls, prefetch_detail
+from modules.common.log import get_logger
+from modules.common.sources import SOURCES
+from modules.common.story import load_stories
+
+logger = get_logger(__name__)
+
+# Articles (text and image) a paper's headline list is likely to open next,
+# fetched before the click: the headline the pointer rests on, the top of the
+# list once it has rendered, and the stories after the one just read. A click on
+# one of them finds it stored and fresh. NEWSAPP_PREFETCH=0 turns it off.
+ENABLED = os.environ.get("NEWSAPP_PREFETCH", "1") != "0"
+# Prefetches running at once per list, on top of the rate limits of the source
+CONCURRENCY = 2
+# What one opening of a list may spend on prefetching
+BUDGET = {"requests": 24, "bytes": 4 * 1024 * 1024, "seconds": 120.0}
+# Stories prefetched from the top of the list when it goes idle, and after the one read
+TOP_ITEMS = 3
+NEXT_ITEMS = 2
+# Lower goes first: what the pointer is on, then what follows the story read
+PRIORITY = {"hover": 0, "next": 1, "idle": 2}
+
+
+class Prefetcher:
+    """Background detail fetches for one opening of a paper's headline list, in priority order."""
+
+    def __init__(self, code, budget=None):
+        self.code = code
+        self.budget = Budget(**dict(BUDGET, **(budget or {})))
+        stories = load_stories(SOURCES[code]["json"], code)
+        # Story indexes in list order; the GUI lists the stories as stored
+        self.order = [story.index for story in stories]
+        # The generation of the list shown; once a refresh replaces it, fetches still
+        # in flight store nothing, since the indexes they were asked for name other stories
+        self.listing = listing_urls(stories)
+        self.lock = threading.Lock()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.finished = {}
+        self.started = set()
+        self.workers = 0
+        self.closed = False
+
+    def hover(self, position):
+        self.request(self.order[position:position + 1], "hover")
+
+    def idle(self):
+        self.request(self.order[:TOP_ITEMS], "idle")
+
+    def read(self, index):
+        # The stories listed after the one just read
+        if index in self.order:
+            position = self.order.index(index)
+            self.request(self.order[position + 1:position + 1 + NEXT_ITEMS], "next")
+
+    def request(self, indexes, trigger):
+        with self.lock:
+            if self.closed or self.budget.exhausted:
+                return
+            for index in indexes:
+                if index in self.started:
+                    continue
+                # Queued again at a higher priority if it is already waiting; the stale entry is skipped
+                self.finished.setdefault(index, threading.Event())
+                heapq.heappush(self.queue, (PRIORITY[trigger], next(self.sequence), index, trigger))
+            while self.workers < CONCURRENCY and self.queue:
+                self.workers += 1
+                threading.Thread(target=self._work, name=f"prefetch-{self.code}", daemon=True).start()
+
+    def _work(self):
+        while True:
+            with self.lock:
+                while self.queue and self.queue[0][2] in self.started:
+                    heapq.heappop(self.queue)
+                if self.closed or not self.queue:
+                    self.workers -= 1
+                    return
+                _, _, index, trigger = heapq.heappop(self.queue)
+                self.started.add(index)
+            try:
+                if prefetch_detail(self.code, index, self.budget, listing=self.listing) is not None:
+                    metrics.count("prefetched", self.code, trigger=trigger)
+            except Exception as e:
+                logger.warning("Prefetch of %s article %s failed: %s", self.code, index, e)
+            finally:
+                self.finished[index].set()
+            if self.budget.exhausted:
+                logger.info("%s prefetch budget spent (%s)", self.code, self.budget.exhausted)
+                self.close()
+
+    def wait(self, index, timeout=DETAIL_DEADLINE):
+        """Before a click: wait for a prefetch of the story still in flight, and drop one still queued."""
+        with self.lock:
+            event = self.finished.get(index)
+            if event is None:
+                return
+            if index not in self.started:
+                self.started.add(index)
+                event.set()
+                return
+        event.wait(timeout)
+
+    def close(self):
+        # Queued stories are dropped; fetches in flight finish, and store what they got
+        # only if the list is still the one this prefetcher was opened on
+        with self.lock:
+            self.closed = True
+            for _, _, index, _ in self.queue:
+                self.finished[index].set()
+            self.queue.clear()
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Limits per source: sustained requests per second, burst size and the
+# maximum number of requests in flight to any one host of that source.
+DEFAULT_LIMITS = {"rate": 4.0, "burst": 8, "concurrency": 4}
+
+SOURCE_LIMITS = {
+    "ET": {"rate": 4.0, "burst": 8, "concurrency": 4},
+    "TH": {"rate": 3.0, "burst": 6, "concurrency": 3},
+    "IE": {"rate": 4.0, "burst": 8, "concurrency": 4},
+    "TOI": {"rate": 4.0, "burst": 8, "concurrency": 4},
+}
+
+# Optional JSON file overriding SOURCE_LIMITS, e.g. {"TH": {"rate": 1.5}}
+LIMITS_FILE = os.environ.get("NEWSAPP_RATE_LIMITS", "config/rate_limits.json")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Block until a token is available
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class HostLimiter:
+    def __init__(self, host, rate, burst, concurrency):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def slot(self):
+        start = time.monotonic()
+        self.slots.acquire()
+        try:
+            self.bucket.acquire()
+            self._record(time.monotonic() - start)
+            yield
+        finally:
+            self.slots.release()
+
+    def _record(self, waited):
+        with self.stats_lock:
+            self.requests += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "requests": self.requests,
+                "queue_delay_total_s": round(self.total_wait, 4),
+                "queue_delay_avg_s": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+                "queue_delay_max_s": round(self.max_wait, 4),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_overrides = None
+
+
+def _load_overrides():
+    global _overrides
+    if _overrides is None:
+        try:
+            with open(LIMITS_FILE, "r", encoding="utf-8") as f:
+                _overrides = json.load(f)
+        except (OSError, ValueError):
+            _overrides = {}
+    return _overrides
+
+
+def limits_for(source):
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(SOURCE_LIMITS.get(source, {}))
+    limits.update(_load_overrides().get(source, {}))
+    return limits
+
+
+def configure(source, **limits):
+    # Change the limits of a source at runtime; hosts already seen keep theirs
+    SOURCE_LIMITS.setdefault(source, {}).update(limits)
+
+
+def limiter_for(url, source=None):
+    host = urlsplit(url).netloc.lower()
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limits = limits_for(source)
+            limiter = HostLimiter(host, limits["rate"], limits["burst"], limits["concurrency"])
+            _limiters[host] = limiter
+    return limiter
+
+
+def queue_delay_stats():
+    # Queueing delay per host since the start of the process
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.stats() for limiter in limiters}
@@ -0,0 +1,303 @@
+import os
+import json
+import zlib
+import math
+import threading
+from collections import Counter
+
+from modules.common.filelock import file_lock
+from modules.common.log import get_logger
+from modules.common.topics import WORD, STOPWORDS, story_text
+
+# numpy is an optional extra (requirements-analytics.txt). Without it stories
+# are not indexed and the GUI shows no related articles.
+
+logger = get_logger(__name__)
+
+INDEX_DIR = os.path.join("files", "related")
+# Width of the stored vectors; every word is hashed, with a sign, into one of them.
+# A lookup reads the whole matrix, so this sets its cost: 100k rows are 50 MB.
+DIM = 128
+# Hashed word columns document frequencies are counted over
+DF_COLUMNS = 2 ** 16
+# Rows compared per matrix product, so a query never holds the whole index in memory twice
+BLOCK = 32768
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def _write_lock(folder):
+    # Held across processes while the index is written: the GUI (clicks and
+    # prefetches) and the newspapers/*main.py scrapers all append to it
+    return file_lock(os.path.join(folder, "write.lock"))
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("numpy is needed for related articles: pip install -r requirements-analytics.txt") from None
+    return np
+
+
+class RelatedIndex:
+    """Normalised story vectors in an append-only file, memory-mapped for lookups.
+
+    vectors.f32 holds one float32 row of DIM per story, keys.jsonl a
+    [source, news_url, text digest, headline, row] per story and df.npy the word
+    document frequencies, with the number of documents last. Writers hold a file
+    lock, and each key names its vector row, so a row without a key (a writer
+    that died between the two appends) is never matched to the wrong story. A
+    story indexed again (say, after its full text was fetched) gets a new row;
+    the old one is skipped by lookups and dropped by compact().
+    """
+
+    def __init__(self, folder):
+        np = _numpy()
+        self.folder = folder
+        self.vectors_path = os.path.join(folder, "vectors.f32")
+        self.keys_path = os.path.join(folder, "keys.jsonl")
+        self.df_path = os.path.join(folder, "df.npy")
+        self.keys = []
+        self.rows = []
+        self.row_keys = {}
+        self.latest = {}
+        self.matrix = np.zeros((0, DIM), dtype=np.float32)
+        self.dead = None
+        self.keys_read = 0
+        self.version = None
+        self.hashes = {}
+        self.refresh_lock = threading.Lock()
+        self.df = None
+        self.df_version = None
+        self._load_df()
+
+    def _df_file_version(self):
+        try:
+            st = os.stat(self.df_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _load_df(self):
+        # Re-read only when another process has saved counts since this one did
+        np = _numpy()
+        version = self._df_file_version()
+        if self.df is not None and version == self.df_version:
+            return
+        try:
+            self.df = np.load(self.df_path)
+        except (OSError, ValueError):
+            self.df = np.zeros(DF_COLUMNS + 1, dtype=np.float64)
+        self.df_version = version
+
+    def _file_version(self):
+        try:
+            return os.path.getsize(self.vectors_path), os.path.getsize(self.keys_path)
+        except OSError:
+            return None
+
+    def refresh(self):
+        # Re-map only when another process (the scrapers) appended since the last look
+        version = self._file_version()
+        if version is None or version == self.version:
+            return self
+        with self.refresh_lock:
+            if version != self.version:
+                self._reload(version)
+        return self
+
+    def _reload(self, version):
+        np = _numpy()
+        if self.version is None or version[1] < self.keys_read:
+            # First look, or the files were compacted: read the keys from the start
+            self.keys, self.rows, self.latest, self.keys_read = [], [], {}, 0
+        with open(self.keys_path, "rb") as f:
+            f.seek(self.keys_read)
+            for line in f:
+                # Only whole lines; the writer may still be in the middle of one
+                if not line.endswith(b"\n"):
+                    break
+                self.keys_read += len(line)
+                key = json.loads(line)
+                self.latest[key[1]] = len(self.keys)
+                # Keys written before they named their row line up with the vectors
+                self.rows.append(key[4] if len(key) > 4 else len(self.keys))
+                self.keys.append(key)
+        rows = version[0] // (DIM * 4)
+        self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, DIM)) \
+            if rows else np.zeros((0, DIM), dtype=np.float32)
+        # Only the latest row of each story is live: rows of stories indexed again
+        # later, and rows whose key is missing, are not. dead is None while all are.
+        self.row_keys = {self.rows[k]: k for k in self.latest.values() if self.rows[k] < rows}
+        live = np.zeros(rows, dtype=bool)
+        live[list(self.row_keys)] = True
+        self.dead = None if live.all() else ~live
+        self.version = version
+
+    def _hash(self, word):
+        h = self.hashes.get(word)
+        if h is None:
+            h = self.hashes[word] = zlib.crc32(word.encode("utf-8"))
+        return h
+
+    def vectorise(self, texts, learn=False):
+        """L2-normalised rows for texts: sublinear TF times IDF, folded into DIM signed buckets."""
+        np = _numpy()
+        words = [Counter(w for w in WORD.findall(text.lower()) if w not in STOPWORDS) for text in texts]
+        if learn:
+            for counts in words:
+                for word in counts:
+                    self.df[self._hash(word) % DF_COLUMNS] += 1
+            self.df[DF_COLUMNS] += len(texts)
+        docs = self.df[DF_COLUMNS]
+        cells, weights = [], []
+        for row, counts in enumerate(words):
+            for word, count in counts.items():
+                h = self._hash(word)
+                idf = math.log((1.0 + docs) / (1.0 + self.df[h % DF_COLUMNS])) + 1.0
+                sign = 1.0 if (h >> 24) & 1 else -1.0
+                cells.append(row * DIM + (h >> 16) % DIM)
+                weights.append(sign * (1.0 + math.log(count)) * idf)
+        matrix = np.bincount(np.asarray(cells, dtype=np.int64), np.asarray(weights),
+                             minlength=len(texts) * DIM).reshape(len(texts), DIM).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add(self, source, stories):
+        """Append rows for stories; ones already indexed with the same text are skipped."""
+        np = _numpy()
+        stories = [s for s in stories if s.news_url]
+        texts = [story_text(s) for s in stories]
+        with _write_lock(self.folder):
+            # Another process may have appended, and counted documents, since the last look
+            self.refresh()
+            self._load_df()
+            known = {tuple(self.keys[k][1:3]) for k in (self.latest.get(s.news_url) for s in stories) if k is not None}
+            fresh = [(s, t) for s, t in zip(stories, texts) if (s.news_url, _digest(t)) not in known]
+            if not fresh:
+                return 0
+            rows = self.vectorise([t for _, t in fresh], learn=True)
+            row_bytes = DIM * 4
+            size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+            first = size // row_bytes
+            with open(self.vectors_path, "r+b" if size else "wb") as f:
+                # A row cut short by a writer that died is overwritten; no key names it
+                f.truncate(first * row_bytes)
+                f.seek(first * row_bytes)
+                f.write(rows.astype(np.float32).tobytes())
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps([source, s.news_url, _digest(t), s.headline, first + i], ensure_ascii=False)
+                                + "\n" for i, (s, t) in enumerate(fresh)))
+            tmp = f"{self.df_path}.tmp.npy"
+            np.save(tmp, self.df)
+            os.replace(tmp, self.df_path)
+            self.df_version = self._df_file_version()
+        return len(fresh)
+
+    def similar(self, queries, k=5, exclude=()):
+        """Top-k (score, row) per query row, blockwise over the index; superseded rows and `exclude` URLs skipped."""
+        np = _numpy()
+        self.refresh()
+        n = self.matrix.shape[0]
+        if n == 0:
+            return [[] for _ in range(len(queries))]
+        drop = {self.rows[self.latest[url]] for url in exclude if url in self.latest}
+        want = k + len(drop)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, n, BLOCK):
+            block = np.asarray(self.matrix[start:start + BLOCK])
+            scores = queries @ block.T
+            if self.dead is not None:
+                scores[:, self.dead[start:start + BLOCK]] = -np.inf
+            # Keep a few candidates per block, then merge with the running best
+            take = min(want, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        results = []
+        for q in range(len(queries)):
+            hits = [(float(best_scores[q, i]), int(best_rows[q, i])) for i in order[q]
+                    if np.isfinite(best_scores[q, i]) and best_rows[q, i] not in drop]
+            results.append(hits[:k])
+        return results
+
+
+def _digest(text):
+    # Short fingerprint of the indexed text, so unchanged stories are not appended again
+    return f"{zlib.crc32(text.encode('utf-8')):08x}"
+
+
+def open_index(base_dir="."):
+    # Absolute, so a process that changes directory does not reuse another folder's index
+    folder = os.path.abspath(os.path.join(base_dir, INDEX_DIR))
+    with _lock:
+        index = _indexes.get(folder)
+        if index is None:
+            index = _indexes[folder] = RelatedIndex(folder)
+    return index
+
+
+def index_stories(source, stories, base_dir="."):
+    """Add new or changed stories of one source to the related-articles index."""
+    index = open_index(base_dir)
+    with _lock:
+        added = index.add(source, stories)
+    if added:
+        logger.debug("Indexed %d %s stories for related articles", added, source)
+    return added
+
+
+def related_stories(news_url, text="", k=5, base_dir=".", current=None):
+    """[(source, news_url, headline, score)] of the k stories most similar to one article.
+
+    The article's indexed vector is used when it has one, otherwise `text`.
+    With `current`, {source: {news_url: headline}} of the stories the papers
+    hold now, stories no longer stored are left out and headlines come from it.
+    """
+    index = open_index(base_dir).refresh()
+    key = index.latest.get(news_url)
+    row = index.rows[key] if key is not None else None
+    if row is not None and row < index.matrix.shape[0]:
+        query = _numpy().asarray(index.matrix[row:row + 1])
+    elif text:
+        query = index.vectorise([text])
+    else:
+        return []
+    # Extra candidates, for the ones dropped as no longer stored
+    hits = index.similar(query, k=k if current is None else 4 * k, exclude=(news_url,))[0]
+    found = []
+    for score, r in hits:
+        source, url, _, headline = index.keys[index.row_keys[r]][:4]
+        if current is not None:
+            headline = current.get(source, {}).get(url)
+            if headline is None:
+                continue
+        found.append((source, url, headline, score))
+    return found[:k]
+
+
+def compact(base_dir="."):
+    # Rewrite the index with only the latest row of each story
+    np = _numpy()
+    index = open_index(base_dir)
+    with _lock, _write_lock(index.folder):
+        index.refresh()
+        rows = sorted(index.row_keys)
+        if len(rows) == len(index.keys) == index.matrix.shape[0]:
+            return 0
+        matrix = np.asarray(index.matrix[rows])
+        keys = [index.keys[index.row_keys[r]][:4] + [i] for i, r in enumerate(rows)]
+        for path, data in ((index.vectors_path, matrix.tobytes()),
+                           (index.keys_path, "".join(json.dumps(k, ensure_ascii=False) + "\n" for k in keys).encode("utf-8"))):
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+        removed = len(index.keys) - len(rows)
+        index.version = None
+        index.refresh()
+    return removed
@@ -0,0 +1,51 @@
+import os
+import json
+import time
+import threading
+
+from modules.common.log import get_logger
+from modules.common.urls import url_key
+
+logger = get_logger(__name__)
+
+# How long a fetched article counts as current; clicks and refreshes within
+# this window reuse the stored text instead of fetching the page again.
+DETAIL_TTL = float(os.environ.get("NEWSAPP_DETAIL_TTL", 6 * 3600))
+
+
+class SeenLedger:
+    """Canonical URLs fetched recently, by kind, persisted across runs as {kind: {key: timestamp}}."""
+
+    def __init__(self, path, ttl=DETAIL_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def fresh(self, kind, url, source=None):
+        stamp = self.entries.get(kind, {}).get(url_key(url, source))
+        return stamp is not None and time.time() - stamp < self.ttl
+
+    def mark(self, kind, url, source=None):
+        with self.lock:
+            self.entries.setdefault(kind, {})[url_key(url, source)] = time.time()
+
+    def save(self):
+        # Expired entries are dropped on every save so the file stays small
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            self.entries = {kind: {k: t for k, t in keys.items() if t >= cutoff}
+                            for kind, keys in self.entries.items()}
+            data = json.dumps(self.entries)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Could not save %s: %s", self.path, e)
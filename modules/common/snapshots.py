@@ -0,0 +1,255 @@
+import os
+import gzip
+import json
+import time
+import shutil
+import argparse
+import threading
+from functools import partial
+from datetime import datetime, timezone
+
+from modules.common.log import get_logger
+from modules.common.sources import SOURCES
+from modules.common.urls import url_key
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = get_logger(__name__)
+
+# Every fetched section and article page, compressed, so extraction can be
+# rerun offline after a site changes its markup. NEWSAPP_SNAPSHOTS=0 turns it off.
+SNAPSHOT_DIR = "snapshots"
+ENABLED = os.environ.get("NEWSAPP_SNAPSHOTS", "1") != "0"
+# zstd when the optional zstandard package is installed, gzip otherwise
+CODEC = "zst" if zstandard else "gz"
+# Listing snapshots this close to the newest one count as the same crawl
+CRAWL_WINDOW = 300
+# Days kept; older day folders and their index lines are dropped
+RETAIN_DAYS = float(os.environ.get("NEWSAPP_SNAPSHOT_DAYS", 14))
+
+_index_lock = threading.Lock()
+_pruned = set()
+# index path -> [file id, bytes read, {(url, kind): newest entry}], so latest() reads only new lines
+_latest = {}
+
+
+def _compress(data, codec):
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec):
+    if codec == "zst":
+        if zstandard is None:
+            raise ImportError("zstandard is needed to read .zst snapshots: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def index_path(source, base_dir="."):
+    return os.path.join(base_dir, SNAPSHOT_DIR, source, "index.jsonl")
+
+
+def save(source, url, kind, content, encoding=None, base_dir="."):
+    """Store one fetched page; kind is "listing" or "article". Never raises."""
+    if not ENABLED or not content:
+        return None
+    now = time.time()
+    stamp = datetime.fromtimestamp(now, timezone.utc)
+    key = url_key(url, source)
+    try:
+        os.makedirs(os.path.join(base_dir, SNAPSHOT_DIR, source, f"{stamp:%Y%m%d}"), exist_ok=True)
+        data = _compress(content, CODEC)
+        # Microseconds in the name, and a suffix if a file still exists (another
+        # process, the same instant), so no fetch overwrites an earlier one
+        attempt = 0
+        while True:
+            suffix = f"-{attempt}" if attempt else ""
+            relative = os.path.join(source, f"{stamp:%Y%m%d}", f"{stamp:%H%M%S%f}-{key}{suffix}.html.{CODEC}")
+            path = os.path.join(base_dir, SNAPSHOT_DIR, relative)
+            try:
+                with open(path, "xb") as f:
+                    f.write(data)
+                break
+            except FileExistsError:
+                attempt += 1
+        entry = {
+            "url": url, "kind": kind, "fetched": stamp.isoformat(timespec="seconds"),
+            "time": round(now, 3), "file": relative.replace(os.sep, "/"), "encoding": encoding, "bytes": len(content),
+        }
+        with _index_lock, open(index_path(source, base_dir), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        logger.warning("Could not store snapshot of %s: %s", url, e)
+        return None
+    if (source, base_dir) not in _pruned:
+        _pruned.add((source, base_dir))
+        prune(source, base_dir)
+    return path
+
+
+def prune(source, base_dir=".", max_age_days=RETAIN_DAYS):
+    """Drop the day folders of one source older than max_age_days, and their index lines."""
+    cutoff = time.time() - max_age_days * 86400
+    oldest_day = f"{datetime.fromtimestamp(cutoff, timezone.utc):%Y%m%d}"
+    folder = os.path.join(base_dir, SNAPSHOT_DIR, source)
+    try:
+        days = [name for name in os.listdir(folder) if name.isdigit() and name < oldest_day]
+    except OSError:
+        return 0
+    if not days:
+        return 0
+    path = index_path(source, base_dir)
+    with _index_lock:
+        kept = [e for e in entries(source, base_dir) if e["file"].split("/")[1] >= oldest_day]
+        try:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(e) + "\n" for e in kept))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not prune %s: %s", path, e)
+            return 0
+    for name in days:
+        shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+    logger.info("Dropped %s snapshots from %d days before %s", source, len(days), oldest_day)
+    return len(days)
+
+
+def entries(source, base_dir="."):
+    try:
+        with open(index_path(source, base_dir), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def latest(source, url, kind="article", base_dir="."):
+    # Index entry of the newest snapshot of one page, or None
+    path = os.path.abspath(index_path(source, base_dir))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _index_lock:
+        state = _latest.get(path)
+        if state is None or state[0] != st.st_ino or st.st_size < state[1]:
+            # First look, or prune() replaced the index: read it from the start
+            state = _latest[path] = [st.st_ino, 0, {}]
+        if st.st_size > state[1]:
+            with open(path, "rb") as f:
+                f.seek(state[1])
+                for line in f:
+                    # Only whole lines; a writer may be in the middle of one
+                    if not line.endswith(b"\n"):
+                        break
+                    state[1] += len(line)
+                    if line.strip():
+                        entry = json.loads(line)
+                        state[2][(entry["url"], entry["kind"])] = entry
+        return state[2].get((url, kind))
+
+
+def read(entry, base_dir="."):
+    # The page as it was fetched: (raw bytes, declared encoding)
+    path = os.path.join(base_dir, SNAPSHOT_DIR, *entry["file"].split("/"))
+    with open(path, "rb") as f:
+        return _decompress(f.read(), entry["file"].rsplit(".", 1)[-1]), entry.get("encoding")
+
+
+def _listing_worker(source, base_dir, entry):
+    from modules.common.engine import parse_listing
+    content, encoding = read(entry, base_dir)
+    return parse_listing(source, content.decode(encoding or "utf-8", errors="replace"))
+
+
+def _article_worker(source, base_dir, entry):
+    from modules.common.engine import extract_record
+    content, encoding = read(entry, base_dir)
+    return extract_record(source, (entry["url"], content, encoding))
+
+
+def reextract(source, base_dir=".", write=False):
+    """Rebuild a source's stories from its snapshots with today's extractors; no network.
+
+    The listing pages of the latest crawl give the stories; the newest article
+    snapshot of each story fills in its details. Listing and article pages are
+    parsed across the worker processes. With write=True the result replaces
+    the stored JSON and CSV; either way a summary is returned.
+    """
+    from modules.common.crawl import crawl_plan, merge_pages, page_urls
+    from modules.common.engine import apply_record, stories_lock
+    from modules.common.story import load_stories, save_stories
+    from modules.common.workers import map_cpu
+
+    archive = entries(source, base_dir)
+    listings = [e for e in archive if e["kind"] == "listing"]
+    if not listings:
+        return {"source": source, "listings": 0, "articles": 0, "stories": 0}
+    newest = max(e["time"] for e in listings)
+    latest = {}
+    for e in listings:
+        if e["time"] >= newest - CRAWL_WINDOW:
+            latest[e["url"]] = e
+    # Same page order as the crawl itself; pages no longer in the plan go last
+    plan = crawl_plan(source)
+    order = {url: i for i, url in enumerate(dict.fromkeys(page_urls(source, plan["sections"], plan["pages"])))}
+    crawl_pages = sorted(latest.values(), key=lambda e: (order.get(e["url"], len(order)), e["time"]))
+    stories = merge_pages(source, map_cpu(partial(_listing_worker, source, base_dir), crawl_pages))
+
+    articles = {}
+    for e in archive:
+        if e["kind"] == "article":
+            articles[e["url"]] = e
+    targets = [s for s in stories if s.news_url in articles]
+    records = map_cpu(partial(_article_worker, source, base_dir), [articles[s.news_url] for s in targets])
+    for story, record in zip(targets, records):
+        apply_record(story, record)
+
+    summary = {
+        "source": source, "listings": len(crawl_pages), "articles": len(targets), "stories": len(stories),
+        # Stories an extractor found nothing for: the first thing to look at after a redesign
+        "missing": {field: sum(1 for s in stories if getattr(s, field) is None)
+                    for field in ("headline", "paragraph", "date_time", "news_url", "image_url")},
+    }
+    if write:
+        spec = SOURCES[source]
+        json_path = os.path.join(base_dir, spec["json"])
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        # Read and replace under the lock a running scrape or prefetch saves under,
+        # so neither of their saves is lost in between
+        with stories_lock(json_path):
+            try:
+                previous = {s.news_url: s for s in load_stories(json_path, source) if s.news_url}
+            except (OSError, ValueError):
+                previous = {}
+            # Images and topics are not in the archive; keep the ones already on disk
+            for story in stories:
+                old = previous.get(story.news_url)
+                if old is not None:
+                    story.topic = old.topic
+                    if old.image_url == story.image_url:
+                        story.image_path = old.image_path
+            save_stories(stories, json_path, os.path.join(base_dir, spec["csv"]))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the current extractors over the snapshot archive")
+    parser.add_argument("command", choices=["reextract"])
+    parser.add_argument("--source", action="append", choices=list(SOURCES), help="default: every source")
+    parser.add_argument("--write", action="store_true", help="replace the stored JSON and CSV with the result")
+    parser.add_argument("--base-dir", default=".")
+    args = parser.parse_args()
+    for source in args.source or SOURCES:
+        start = time.perf_counter()
+        summary = reextract(source, args.base_dir, write=args.write)
+        print(json.dumps(summary), f"({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Every newspaper as data: where its pages live, where its output goes and the
+# CSS selectors for its listing and article pages. modules/common/engine.py
+# compiles these once and runs the same code for every source.
+#
+# "canonical" lists the source's own tracking parameters and the path rewrites
+# that map AMP/lite variants to the regular article URL (modules/common/urls.py).
+#
+# "image_hosts" are the CDNs the paper's pictures come from; the GUI connects to
+# them and to base_url ahead of the first click (modules/common/warmup.py).
+#
+# "sections" and "page_url" drive modules/common/crawl.py: every section is
+# crawled to the configured depth, page n > 1 being page_url.format(section=..., page=n).
+#
+# A field is a selector, a list of selectors tried in order, or a dict with
+# "select" and "attr" when the value comes from an attribute instead of the text.
+#
+# Article details come from the page's NewsArticle JSON-LD when it has a headline,
+# body and image, and from the "detail" selectors otherwise; "json_ld": False in
+# "detail" always uses the selectors.
+
+SOURCES = {
+    "ET": {
+        "name": "The Economic Times",
+        "json": "files/ET/et_stories.json",
+        "csv": "files/ET/et_stories.csv",
+        "section": "https://economictimes.indiatimes.com/news/india",
+        "sections": ["https://economictimes.indiatimes.com/news/india"],
+        "page_url": "{section}?curpg={page}",
+        "html_path": "data/ET/ET.html",
+        "base_url": "https://economictimes.indiatimes.com",
+        "image_folder": "images/ET_images",
+        "image_hosts": ["https://img.etimg.com"],
+        "canonical": {
+            "tracking_params": ["from"],
+            "amp": [(r"/amp_articleshow/", "/articleshow/")],
+        },
+        "listing": {
+            "items": "div.eachStory",
+            "limit": None,
+            "headline": "h3",
+            "date": {"select": "time.date-format", "attr": "data-time"},
+            "paragraph": 'p[class="wrapLines l5"]',
+            "collapse_whitespace": False,
+            "save_alt_text": False,
+        },
+        "detail": {
+            "body": {"mode": "text", "select": "div.artText"},
+            "image": {"select": "div.imgBox figure.artImg img", "attr": "src"},
+            "date": None,
+        },
+    },
+    "TH": {
+        "name": "The Hindu",
+        "json": "files/TH/th_stories.json",
+        "csv": "files/TH/th_stories.csv",
+        "section": "https://www.thehindu.com/news/national/",
+        "sections": ["https://www.thehindu.com/news/national/"],
+        "page_url": "{section}?page={page}",
+        "html_path": "data/TH/TH.html",
+        "base_url": "https://www.thehindu.com",
+        "image_folder": "images/TH_images",
+        "image_hosts": ["https://th-i.thgim.com"],
+        "canonical": {
+            "tracking_params": ["homepage"],
+            "amp": [(r"\.ece/amp/?$", ".ece")],
+        },
+        "listing": {
+            "items": 'div[class="element row-element"]',
+            "limit": 14,
+            "headline": "h2, h3",
+            "date": ["span.dateline", "div.dateline"],
+            "paragraph": "p",
+            "collapse_whitespace": True,
+            "save_alt_text": True,
+        },
+        "detail": {
+            "body": {"mode": "text", "select": "div.articlebodycontent"},
+            "image": {
+                "select": "div.article-picture picture source[srcset]",
+                "attr": "srcset",
+                "alt": "div.article-picture picture img",
+            },
+            "date": "div.update-publish-time p.updated-time span",
+        },
+    },
+    "IE": {
+        "name": "The Indian Express",
+        "json": "files/IE/ie_stories.json",
+        "csv": "files/IE/ie_stories.csv",
+        "section": "https://indianexpress.com/section/india/",
+        "sections": ["https://indianexpress.com/section/india/"],
+        "page_url": "{section}page/{page}/",
+        "html_path": "data/IE/TIE.html",
+        "base_url": "https://indianexpress.com",
+        "image_folder": "images/IE_images",
+        "image_hosts": ["https://images.indianexpress.com"],
+        "canonical": {
+            "tracking_params": ["ref"],
+            "amp": [(r"/(lite|amp)/?$", "/")],
+        },
+        "listing": {
+            # The lead story ("articles first") is the first match, then the rest
+            "items": "div.articles",
+            "limit": 25,
+            "headline": "h2",
+            "date": ".date",
+            "paragraph": "p",
+            "collapse_whitespace": True,
+            "save_alt_text": True,
+        },
+        "detail": {
+            "body": {
+                "mode": "paragraphs",
+                "select": [
+                    "div#pcl-full-content.story_details",
+                    'div[class="ev-meter-content ie-premium-content-block"]',
+                ],
+            },
+            "image": {"select": "span.custom-caption img", "attr": "src"},
+            "date": None,
+        },
+    },
+    "TOI": {
+        "name": "Times of India",
+        "json": "files/TOI/toi_stories.json",
+        "csv": "files/TOI/toi_stories.csv",
+        "section": "https://timesofindia.indiatimes.com/",
+        "sections": ["https://timesofindia.indiatimes.com/"],
+        "page_url": "{section}?page={page}",
+        "html_path": "data/TOI/TOI.html",
+        "base_url": "https://timesofindia.indiatimes.com",
+        "image_folder": "images/TOI_images",
+        "image_hosts": ["https://static.toiimg.com"],
+        "canonical": {
+            "tracking_params": ["from"],
+            "amp": [(r"/amp_articleshow/", "/articleshow/")],
+        },
+        "listing": {
+            "items": "div.col_l_6",
+            "limit": 24,
+            "headline": "figcaption",
+            "date": {"select": "time.date-format", "attr": "data-time"},
+            "paragraph": 'p[class="wrapLines l5"]',
+            "collapse_whitespace": False,
+            "save_alt_text": True,
+        },
+        "detail": {
+            "body": {
+                "mode": "strings",
+                "select": "div._s30J",
+                "skip": ["subscribe", "advertisement", "story continues", "poll", "comments"],
+            },
+            "image": {"select": "div.wJnIp img", "attr": "src"},
+            "date": "div.xf8Pm span",
+        },
+    },
+}
@@ -0,0 +1,93 @@
+import os
+import heapq
+import itertools
+import threading
+
+from modules.common.sources import SOURCES
+from modules.common.story import load_stories
+
+
+class StoryStore:
+    """Read-only view of files/*/*.json that re-parses a file only when it changes."""
+
+    def __init__(self, base_dir="."):
+        self.base_dir = base_dir
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def path(self, source):
+        return os.path.join(self.base_dir, SOURCES[source]["json"])
+
+    def version(self, source):
+        # (mtime, size) of the JSON file, or None if it has not been scraped yet
+        try:
+            st = os.stat(self.path(source))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def stories(self, source):
+        version = self.version(source)
+        if version is None:
+            return []
+        return self._load(source, version)[0]
+
+    def by_time(self, source):
+        # Stories newest first; ones without a publication time go last
+        version = self.version(source)
+        if version is None:
+            return []
+        return self._load(source, version)[2]
+
+    def _load(self, source, version):
+        with self.lock:
+            cached = self.cache.get(source)
+            if cached and cached[0] == version:
+                return cached[1:]
+        try:
+            stories = load_stories(self.path(source), source)
+        except (OSError, ValueError):
+            return [], [], []
+        # Lower-cased text is kept alongside so search does not redo it per query
+        search_text = [f"{story.headline or ''} {story.paragraph or ''}".lower() for story in stories]
+        # Sorted once per file version; the timeline merges these without re-sorting
+        by_time = sorted(stories, key=_published, reverse=True)
+        with self.lock:
+            self.cache[source] = (version, stories, search_text, by_time)
+        return stories, search_text, by_time
+
+    def story(self, source, index):
+        return next((s for s in self.stories(source) if s.index == index), None)
+
+    def search(self, query, sources=None):
+        terms = query.lower().split()
+        for source in sources or SOURCES:
+            version = self.version(source)
+            if version is None:
+                continue
+            stories, search_text, _ = self._load(source, version)
+            for story, text in zip(stories, search_text):
+                if all(term in text for term in terms):
+                    yield source, story
+
+    def timeline(self, sources=None):
+        """(source, story) across papers, newest first, merged lazily from the per-source orderings.
+
+        Only as many stories are compared as the caller consumes, so showing the
+        first page costs the same however many stories are stored.
+        """
+        cursors = [zip(itertools.repeat(source), self.by_time(source)) for source in sources or SOURCES]
+        return heapq.merge(*cursors, key=lambda pair: _published(pair[1]), reverse=True)
+
+
+def _published(story):
+    # UTC ISO 8601 text sorts chronologically; "" puts undated stories last
+    return story.published or ""
+
+
+def public(story, source=None):
+    # Plain dict with the JSON column names, as handed to a client
+    data = story.to_dict()
+    if source:
+        data["Source"] = source
+    return data
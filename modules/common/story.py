@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import threading
+from operator import attrgetter, itemgetter
+
+from modules.common.csvout import write_stories_csv
+
+# Story attribute -> column name in files/*/*_stories.json and .csv. The files
+# on disk keep these names so the GUI and older scrapes read them unchanged.
+FIELDS = {
+    "index": "Index",
+    "image_url": "Image URL",
+    "image_alt": "Image Alt Text",
+    "headline": "Headline",
+    "date_time": "Date and Time",
+    "published": "Published (UTC)",
+    "paragraph": "Paragraph",
+    "image_path": "Image Path",
+    "news_url": "News URL",
+    "topic": "Topic",
+}
+KEYS = {key: attr for attr, key in FIELDS.items()}
+_field_values = attrgetter(*FIELDS)
+# Every column but the index, which a refresh renumbers; what diff_stories compares
+_content_values = attrgetter(*(attr for attr in FIELDS if attr != "index"))
+# Column values of one JSON row, in FIELDS order, in a single call
+_columns = itemgetter(*FIELDS.values())
+
+# Placeholders earlier scrapes stored for missing fields; they load as None
+PLACEHOLDERS = frozenset({
+    "", "No news URL", "No image URL", "No image alt text", "No alt text",
+    "No headline", "No date and time", "No paragraph",
+})
+# Longer strings cannot be placeholders, so they are never hashed to check
+PLACEHOLDER_MAX = max(map(len, PLACEHOLDERS))
+
+
+class Story:
+    """One scraped story. Missing fields are None; unknown JSON keys are kept in `extra`."""
+
+    __slots__ = ("source",) + tuple(FIELDS) + ("extra",)
+
+    def __init__(self, source, index, headline=None, paragraph=None, date_time=None,
+                 news_url=None, image_url=None, image_alt=None, image_path=None, extra=None,
+                 published=None, topic=None):
+        # Every story of a source shares one interned code string
+        self.source = sys.intern(source)
+        self.index = index
+        self.headline = headline
+        self.paragraph = paragraph
+        self.date_time = date_time
+        # date_time as printed by the paper; published is the same moment in UTC ISO 8601
+        self.published = published
+        self.news_url = news_url
+        self.image_url = image_url
+        self.image_alt = image_alt
+        self.image_path = image_path
+        # Set by modules/common/topics.py, shared by related stories across papers
+        self.topic = topic
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, source, data):
+        # Slots are filled straight from one itemgetter call, without __init__;
+        # rows from files written before a column existed take the per-key path
+        try:
+            values = _columns(data)
+            known = len(data) == len(FIELDS)
+        except KeyError:
+            values = tuple(map(data.get, FIELDS.values()))
+            known = data.keys() <= KEYS.keys()
+        story = cls.__new__(cls)
+        story.source = sys.intern(source)
+        (story.index, image_url, image_alt, headline, date_time, story.published,
+         paragraph, image_path, news_url, story.topic) = values
+        story.image_url = _value(image_url)
+        story.headline = headline = _value(headline)
+        # Papers mostly use the headline as the image's alt text; keep one copy of it
+        image_alt = _value(image_alt)
+        story.image_alt = headline if image_alt is not None and image_alt == headline else image_alt
+        story.date_time = _value(date_time)
+        story.paragraph = _value(paragraph)
+        story.image_path = _value(image_path)
+        story.news_url = _value(news_url)
+        story.extra = None if known else \
+            {k: v for k, v in data.items() if k not in KEYS and not k.startswith("_")} or None
+        return story
+
+    def to_dict(self):
+        data = {key: getattr(self, attr) for attr, key in FIELDS.items()}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key, default=None):
+        # Dict-style access by column name, for code that still thinks in JSON keys
+        attr = KEYS.get(key)
+        if attr is not None:
+            value = getattr(self, attr)
+        else:
+            value = (self.extra or {}).get(key)
+        return default if value is None else value
+
+    def values(self):
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, Story) and self.values() == other.values()
+
+    def __repr__(self):
+        return f"Story({self.source!r}, {self.index!r}, headline={self.headline!r})"
+
+    def changed_fields(self, other):
+        mine, theirs = _field_values(self), _field_values(other)
+        if mine == theirs:
+            return []
+        return [attr for attr, a, b in zip(FIELDS, mine, theirs) if a != b]
+
+
+def _value(value):
+    if value.__class__ is str and len(value) <= PLACEHOLDER_MAX and value in PLACEHOLDERS:
+        return None
+    return value
+
+
+def _row_hook(source):
+    # Each row becomes a record as soon as it is decoded, so the dicts never pile
+    # up alongside the records; objects nested in unknown columns stay dicts
+    def row(data):
+        return Story.from_dict(source, data) if "Index" in data else data
+    return row
+
+
+def decode_stories(text, source):
+    return json.loads(text, object_hook=_row_hook(source))
+
+
+def load_stories(path, source):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f, object_hook=_row_hook(source))
+
+
+def save_stories(stories, json_path, csv_path=None):
+    rows = [story.to_dict() for story in stories]
+    # Written aside and swapped in: the GUI reads the file while prefetches save it
+    tmp = f"{json_path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f_json:
+        json.dump(rows, f_json, indent=4, ensure_ascii=False)
+    os.replace(tmp, json_path)
+    if csv_path:
+        write_stories_csv(rows, csv_path)
+
+
+def diff_stories(old, new):
+    """Compare two scrapes of a source by News URL: (added, removed, {url: changed fields})."""
+    before = {story.news_url: story for story in old}
+    after = {story.news_url: story for story in new}
+    added = [story for url, story in after.items() if url not in before]
+    removed = [story for url, story in before.items() if url not in after]
+    changed = {}
+    for url, story in after.items():
+        old = before.get(url)
+        # One tuple comparison per story; fields are listed only for those that changed
+        if old is not None and _content_values(old) != _content_values(story):
+            changed[url] = [f for f in old.changed_fields(story) if f != "index"]
+    return added, removed, changed
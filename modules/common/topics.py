@@ -0,0 +1,322 @@
+import os
+import re
+import zlib
+import time
+import argparse
+import itertools
+
+from modules.common import metrics
+from modules.common.filelock import file_lock
+from modules.common.log import get_logger
+from modules.common.sources import SOURCES
+from modules.common.store import StoryStore
+from modules.common.story import load_stories, save_stories
+
+# numpy and scipy are optional extras (requirements-analytics.txt); they are
+# imported when the topic stage runs, and by a refresh only once a model is saved.
+
+logger = get_logger(__name__)
+
+TOPICS = {
+    "clusters": 12,
+    # Words are hashed into this many columns, so new stories never change the
+    # vocabulary and the model can keep learning across runs
+    "dim": 2 ** 16,
+    "batch": 1024,
+    "epochs": 3,
+    # Most recent stories, across all papers, that are labelled on each run
+    "window": 50000,
+}
+MODEL_DIR = os.path.join("files", "topics")
+
+WORD = re.compile(r"[a-z][a-z0-9]+")
+STOPWORDS = frozenset("""
+a about after again against all also an and any are as at be been before being between both but by
+can could did do does doing down during each few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not now of off on once
+only or other our out over own said same says she should so some such than that the their them then
+there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your new over per amid
+""".split())
+
+
+def _numpy():
+    try:
+        import numpy as np
+        from scipy import sparse
+    except ImportError:
+        raise ImportError("numpy and scipy are needed for topics: pip install -r requirements-analytics.txt") from None
+    return np, sparse
+
+
+def story_text(story):
+    # The headline counts twice; it is the densest description of the story
+    headline = story.headline or ""
+    return f"{headline} {headline} {story.paragraph or ''}"
+
+
+class Vectoriser:
+    """Hashed term counts for a batch of texts; remembers which word each column came from."""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.columns = {}
+        self.words = {}
+
+    def column(self, word):
+        col = self.columns.get(word)
+        if col is None:
+            col = self.columns[word] = zlib.crc32(word.encode("utf-8")) & (self.dim - 1)
+            self.words.setdefault(col, word)
+        return col
+
+    def counts(self, texts):
+        np, sparse = _numpy()
+        indptr = [0]
+        indices = []
+        columns, column = self.columns, self.column
+        for text in texts:
+            indices += [columns[w] if w in columns else column(w)
+                        for w in WORD.findall(text.lower()) if w not in STOPWORDS]
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        matrix = sparse.csr_matrix((data, np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+                                   shape=(len(texts), self.dim))
+        matrix.sum_duplicates()
+        return matrix
+
+
+class TopicModel:
+    """Spherical mini-batch k-means over L2-normalised TF-IDF rows, persisted between runs."""
+
+    def __init__(self, clusters, dim, seed=0):
+        np, _ = _numpy()
+        self.rng = np.random.default_rng(seed)
+        self.clusters = clusters
+        self.dim = dim
+        self.centroids = None
+        self.sizes = np.zeros(clusters, dtype=np.float64)
+        self.df = np.zeros(dim, dtype=np.float64)
+        self.docs = 0
+        # Cluster labels of the last full run; new stories are labelled with these
+        self.names = None
+
+    @classmethod
+    def load(cls, path, clusters, dim):
+        np, _ = _numpy()
+        model = cls(clusters, dim)
+        try:
+            saved = np.load(path)
+        except (OSError, ValueError):
+            return model
+        if saved["centroids"].shape != (clusters, dim):
+            logger.warning("Topic model in %s has another shape; starting over", path)
+            return model
+        model.centroids = saved["centroids"]
+        model.sizes = saved["sizes"]
+        model.df = saved["df"]
+        model.docs = int(saved["docs"])
+        if "names" in saved.files:
+            model.names = [str(name) for name in saved["names"]]
+        return model
+
+    def save(self, path):
+        np, _ = _numpy()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}.npz"
+        arrays = {"centroids": self.centroids, "sizes": self.sizes, "df": self.df, "docs": self.docs}
+        if self.names:
+            arrays["names"] = np.array(self.names)
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    def learn_df(self, counts):
+        # Document frequencies grow with every new story, so IDF keeps up with the archive
+        self.df += counts.getnnz(axis=0)
+        self.docs += counts.shape[0]
+
+    def tfidf(self, counts):
+        np, sparse = _numpy()
+        matrix = counts.copy()
+        matrix.data = 1.0 + np.log(matrix.data)
+        idf = np.log((1.0 + self.docs) / (1.0 + self.df)) + 1.0
+        matrix = matrix @ sparse.diags(idf.astype(np.float32))
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        norms[norms == 0] = 1.0
+        return sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+    def _seed(self, rows):
+        # k-means++ on a sample: each next centroid is drawn in proportion to its cosine distance
+        np, _ = _numpy()
+        sample = rows[self.rng.choice(rows.shape[0], min(rows.shape[0], 2000), replace=False)]
+        chosen = [int(self.rng.integers(sample.shape[0]))]
+        distance = 1.0 - (sample @ sample[chosen[0]].T).toarray().ravel()
+        for _ in range(1, self.clusters):
+            weights = np.clip(distance, 0, None)
+            total = weights.sum()
+            pick = int(self.rng.choice(sample.shape[0], p=weights / total)) if total > 0 \
+                else int(self.rng.integers(sample.shape[0]))
+            chosen.append(pick)
+            distance = np.minimum(distance, 1.0 - (sample @ sample[pick].T).toarray().ravel())
+        self.centroids = sample[chosen].toarray().astype(np.float32)
+
+    def assign(self, rows):
+        np, _ = _numpy()
+        return np.asarray((rows @ self.centroids.T)).argmax(axis=1)
+
+    def partial_fit(self, rows, batch, epochs):
+        """Mini-batch updates from new rows only; earlier stories live on in the centroids."""
+        np, sparse = _numpy()
+        if rows.shape[0] == 0:
+            return
+        if self.centroids is None:
+            if rows.shape[0] < self.clusters:
+                return
+            self._seed(rows)
+        for _ in range(epochs):
+            order = self.rng.permutation(rows.shape[0])
+            for start in range(0, len(order), batch):
+                block = rows[order[start:start + batch]]
+                labels = self.assign(block)
+                # One sparse product sums every cluster's members at once
+                members = sparse.csr_matrix((np.ones(len(labels), dtype=np.float32),
+                                             (labels, np.arange(len(labels)))),
+                                            shape=(self.clusters, len(labels)))
+                sums = np.asarray((members @ block).todense())
+                found = np.bincount(labels, minlength=self.clusters)
+                hit = found > 0
+                self.sizes[hit] += found[hit]
+                rate = (found[hit] / self.sizes[hit])[:, None]
+                self.centroids[hit] = (1 - rate) * self.centroids[hit] + rate * (sums[hit] / found[hit][:, None])
+                norms = np.linalg.norm(self.centroids[hit], axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                self.centroids[hit] /= norms
+
+    def labels(self, vectoriser, top=3):
+        # Heaviest centroid columns that map back to a word seen in this run
+        np, _ = _numpy()
+        names = []
+        for centroid in self.centroids:
+            words = []
+            for col in np.argsort(centroid)[::-1]:
+                if centroid[col] <= 0 or len(words) == top:
+                    break
+                word = vectoriser.words.get(int(col))
+                if word:
+                    words.append(word)
+            names.append(" / ".join(words) or "misc")
+        return names
+
+
+def _model_lock(model_path):
+    # The model is read, refined and saved by the topic runs and by every refresh
+    # that labels its new stories, in several processes at once
+    return file_lock(f"{model_path}.lock")
+
+
+def assign_topics(stories, base_dir=".", config=None):
+    """Label stories that have no topic yet with the saved model, and learn from them.
+
+    Called by a refresh before its stories are saved; until the first topic run
+    has saved a model nothing is labelled (and numpy is not imported). Returns
+    the number of stories labelled.
+    """
+    config = dict(TOPICS, **(config or {}))
+    model_path = os.path.join(base_dir, MODEL_DIR, "model.npz")
+    new = [story for story in stories if story.topic is None]
+    if not new or not os.path.exists(model_path):
+        return 0
+    with _model_lock(model_path):
+        model = TopicModel.load(model_path, config["clusters"], config["dim"])
+        if model.centroids is None:
+            return 0
+        vectoriser = Vectoriser(config["dim"])
+        counts = vectoriser.counts([story_text(story) for story in new])
+        model.learn_df(counts)
+        rows = model.tfidf(counts)
+        model.partial_fit(rows, config["batch"], config["epochs"])
+        names = model.names or model.labels(vectoriser)
+        for story, cluster in zip(new, model.assign(rows)):
+            story.topic = names[cluster]
+        model.save(model_path)
+    return len(new)
+
+
+def update_topics(base_dir=".", config=None):
+    """Learn from stories not seen before, then label every story in the window and save the labels.
+
+    Returns {source: number of stories whose label changed}.
+    """
+    config = dict(TOPICS, **(config or {}))
+    model_path = os.path.join(base_dir, MODEL_DIR, "model.npz")
+    with _model_lock(model_path):
+        return _update_topics(base_dir, config, model_path)
+
+
+def _update_topics(base_dir, config, model_path):
+    # The stories lock is the one clicks and prefetches save under; imported
+    # here because the engine imports this module (through related.py)
+    from modules.common.engine import stories_lock
+    np, _ = _numpy()
+    model = TopicModel.load(model_path, config["clusters"], config["dim"])
+
+    window = list(itertools.islice(StoryStore(base_dir).timeline(), config["window"]))
+    if not window:
+        return {}
+    vectoriser = Vectoriser(config["dim"])
+    with metrics.span("vectorise", "topics"):
+        counts = vectoriser.counts([story_text(story) for _, story in window])
+    # A story without a topic has not been through the model yet; refreshes keep
+    # the topic of stories still listed, so only arrivals are learned from
+    new = np.array([story.topic is None for _, story in window])
+    if model.centroids is None:
+        # No saved model (first run, or it was deleted): learn from the whole window
+        new[:] = True
+
+    with metrics.span("cluster", "topics"):
+        model.learn_df(counts[new])
+        rows = model.tfidf(counts)
+        model.partial_fit(rows[new], config["batch"], config["epochs"])
+        if model.centroids is None:
+            logger.info("Only %d stories; waiting for at least %d before clustering", len(window), model.clusters)
+            return {}
+        assigned = model.assign(rows)
+        names = model.names = model.labels(vectoriser)
+
+    labels = {}
+    for (source, story), cluster in zip(window, assigned):
+        labels.setdefault(source, {})[story.news_url or story.headline] = names[cluster]
+
+    changed = {}
+    with metrics.span("persist", "topics"):
+        for source, by_url in labels.items():
+            spec = SOURCES[source]
+            json_path = os.path.join(base_dir, spec["json"])
+            # Read again under the lock: a click may have saved the file since the window was read
+            with stories_lock(json_path):
+                stories = load_stories(json_path, source)
+                changed[source] = 0
+                for story in stories:
+                    topic = by_url.get(story.news_url or story.headline)
+                    if topic and topic != story.topic:
+                        story.topic = topic
+                        changed[source] += 1
+                if changed[source]:
+                    save_stories(stories, json_path, os.path.join(base_dir, spec["csv"]))
+        model.save(model_path)
+    logger.info("Topics: %d stories, %d new, %s", len(window), int(new.sum()), ", ".join(sorted(set(names))))
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group stored stories of all papers by topic")
+    parser.add_argument("--clusters", type=int, default=TOPICS["clusters"])
+    parser.add_argument("--base-dir", default=".")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    changed = update_topics(args.base_dir, {"clusters": args.clusters})
+    print(f"Labelled in {time.perf_counter() - start:.2f}s; changed: {changed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from modules.common.sources import SOURCES
+
+# Query parameters that only say where a click came from; dropped for every source
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "cmpid"}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def canonical_url(url, source=None):
+    """One spelling per resource: lower-case host, no fragment, tracking or AMP markers, sorted query."""
+    if not url:
+        return url
+    rules = SOURCES.get(source, {}).get("canonical", {})
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = parts.hostname.lower() if parts.hostname else ""
+    if parts.port and not (scheme == "http" and parts.port == 80 or scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    for pattern, replacement in rules.get("amp", ()):
+        path = re.sub(pattern, replacement, path)
+
+    drop = TRACKING_PARAMS | set(rules.get("tracking_params", ()))
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in drop and not k.lower().startswith(TRACKING_PREFIXES)
+             and not (k.lower() == "amp" or (k.lower() == "outputtype" and v.lower() == "amp"))]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+def url_key(url, source=None):
+    # Short stable id of a canonical URL, for file names and persisted seen-sets
+    return hashlib.sha1(canonical_url(url, source).encode("utf-8")).hexdigest()[:20]
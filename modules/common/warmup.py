@@ -0,0 +1,107 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.common.log import get_logger
+from modules.common.sources import SOURCES
+
+logger = get_logger(__name__)
+
+# Work the GUI starts while its welcome screen plays. Every paper's site and
+# image CDN gets a pooled connection, so the first click does not pay for DNS,
+# TCP and TLS. With NEWSAPP_BACKGROUND_REFRESH=1 the listings are refreshed
+# too, and a click on a paper refreshed this way opens without waiting for the scraper.
+BACKGROUND_REFRESH = os.environ.get("NEWSAPP_BACKGROUND_REFRESH") == "1"
+# A background refresh this recent stands in for the one a click would run
+REFRESH_MAX_AGE = 300
+# How long a click waits for a background refresh still in progress, in seconds;
+# after that it opens the stories already stored rather than crawl the paper twice
+REFRESH_WAIT = 30.0
+
+_lock = threading.Lock()
+_refreshes = {}
+
+
+def warm_urls():
+    # (source, url) of every host the GUI fetches from first
+    for code, spec in SOURCES.items():
+        yield code, spec["base_url"]
+        for host in spec.get("image_hosts", ()):
+            yield code, host
+
+
+def warm_connections():
+    """Open one pooled connection to every paper and image host, in parallel; {url: seconds or None}."""
+    from modules.common.httpclient import preconnect
+
+    def connect(pair):
+        code, url = pair
+        start = time.perf_counter()
+        try:
+            preconnect(url, source=code)
+        except Exception as e:
+            logger.debug("Could not warm %s: %s", url, e)
+            return url, None
+        return url, time.perf_counter() - start
+
+    pairs = list(warm_urls())
+    with ThreadPoolExecutor(max_workers=len(pairs)) as pool:
+        timings = dict(pool.map(connect, pairs))
+    warmed = [t for t in timings.values() if t is not None]
+    logger.info("Warmed %d of %d hosts%s", len(warmed), len(timings),
+                f", slowest {max(warmed) * 1000:.0f} ms" if warmed else "")
+    return timings
+
+
+def refresh_listings(codes):
+    # The same crawl a paper's button runs, in this process so it reuses the warm connections.
+    # It saves under the stories lock and keeps articles that clicks and prefetches saved
+    # meanwhile; their saves, in turn, go to the story with their URL in the new list.
+    from modules.common.crawl import crawl
+
+    for code in codes:
+        state = _refreshes[code]
+        try:
+            state["ok"] = bool(crawl(code))
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", code, e)
+        state["finished"] = time.time()
+        state["done"].set()
+
+
+def start(background_refresh=None):
+    """Warm connections, then optionally refresh every listing, on a daemon thread."""
+    refresh = BACKGROUND_REFRESH if background_refresh is None else background_refresh
+    codes = list(SOURCES) if refresh else []
+    with _lock:
+        # Registered now, so a click during the warm-up waits for its refresh
+        for code in codes:
+            _refreshes[code] = {"done": threading.Event(), "ok": False, "finished": None}
+
+    def run():
+        warm_connections()
+        refresh_listings(codes)
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def refresh_state(code):
+    """Never waits: "running" while a background refresh of code is queued or under way,
+    "fresh" once one stored stories within REFRESH_MAX_AGE, otherwise None."""
+    with _lock:
+        state = _refreshes.get(code)
+    if state is None:
+        return None
+    if not state["done"].is_set():
+        return "running"
+    if state["ok"] and time.time() - state["finished"] < REFRESH_MAX_AGE:
+        return "fresh"
+    return None
+
+
+def code_for(newspaper):
+    # Source code of a newspaper's display name, as the GUI buttons use
+    return next((code for code, spec in SOURCES.items() if spec["name"] == newspaper), None)
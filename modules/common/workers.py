@@ -0,0 +1,62 @@
+import os
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.common.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def usable_cpus():
+    # Cores this process may run on: affinity masks and cpusets (taskset, containers)
+    # leave fewer than os.cpu_count(), which counts the whole machine
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+# Processes for CPU-bound work such as parsing article pages; one per usable
+# core unless NEWSAPP_WORKERS says otherwise. 1 keeps everything in-process.
+WORKERS = int(os.environ.get("NEWSAPP_WORKERS", 0)) or usable_cpus()
+# Smaller batches are not worth shipping to another process
+INLINE_BELOW = 4
+# Tasks per worker the batch is cut into: large enough to keep pickling
+# overhead low, small enough that a slow page does not idle the other workers
+CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool():
+    # Started on first use and shared by every batch of the process
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS)
+            atexit.register(_pool.shutdown)
+            logger.debug("Started %d parse workers", WORKERS)
+        return _pool
+
+
+def map_cpu(fn, items):
+    """[fn(item) for item in items], spread over the worker processes in chunks.
+
+    fn must be picklable: a module-level function, or functools.partial of one.
+    Falls back to the calling process for one core or a handful of items, and
+    when the pool cannot be used (a worker died, or processes are unavailable).
+    """
+    global _pool
+    items = list(items)
+    if WORKERS <= 1 or len(items) < INLINE_BELOW:
+        return [fn(item) for item in items]
+    chunksize = max(1, len(items) // (WORKERS * CHUNKS_PER_WORKER))
+    try:
+        return list(pool().map(fn, items, chunksize=chunksize))
+    except (OSError, RuntimeError) as e:
+        # BrokenProcessPool is a RuntimeError; the next batch starts a fresh pool
+        with _pool_lock:
+            _pool = None
+        logger.warning("Parse workers unavailable (%s); parsing in-process", e)
+        return [fn(item) for item in items]
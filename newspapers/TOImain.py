@@ -1,34 +1,36 @@
 import sys
 import os
+import argparse
 
 # Add project root directory (NEWSAPP) to sys.path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from modules.timesofindia.fetcher import fetch_and_save_to_file
-from modules.timesofindia.scraper import scrape_toi
+from modules.common import metrics
+from modules.common.crawl import crawl, fill_details
+from modules.common.log import get_logger
+from modules.common.httpclient import log_queue_delay_report
 
-def main():
-    url = "https://timesofindia.indiatimes.com/"
-    html_path = "data/TOI/TOI.html"
-
-    # Ensure the data directory exists
-    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+logger = get_logger("newspapers.TOImain")
 
+def main(details=None):
+    # Sections, page depth and the per-run budget come from the source
+    # registry and config/crawl.json
     try:
-        print("[INFO] Fetching data from Times of India...")
-        fetch_and_save_to_file(url, html_path)
-        print(f"[INFO] HTML content saved to {html_path}")
+        logger.info("Crawling Times of India...")
+        stories = crawl("TOI")
+        logger.info("Scraping completed: %d stories.", len(stories))
+        updated = fill_details("TOI", stories, details)
+        if updated:
+            logger.info("Filled in %d articles.", len(updated))
     except Exception as e:
-        print(f"[ERROR] Failed to fetch data: {e}")
-        return
+        logger.error("Failed to scrape data: %s", e)
 
-    try:
-        print("[INFO] Starting to scrape content...")
-        scrape_toi(html_path)
-        print("[INFO] Scraping completed successfully.")
-    except Exception as e:
-        print(f"[ERROR] Failed to scrape data: {e}")
+    log_queue_delay_report()
+    metrics.write_report("TOI")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--details", type=int, help="articles to fill in from the top of the list "
+                                                    "(default: details in config/crawl.json, else 0)")
+    main(parser.parse_args().details)
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+
+from server import project_root, make_server, add_behaviour_args, behaviour_from_args
+
+# The scripts the GUI runs when a newspaper is selected
+REFRESH_SCRIPTS = {
+    "ET": "ETmain.py",
+    "TH": "THmain.py",
+    "IE": "TIEmain.py",
+    "TOI": "TOImain.py",
+}
+
+
+def refresh(sources, env, workdir, concurrent=True):
+    # One end-to-end refresh: fetch, scrape and persist every selected paper
+    start = time.perf_counter()
+    commands = [[sys.executable, os.path.join(project_root, "newspapers", REFRESH_SCRIPTS[code])] for code in sources]
+    if concurrent:
+        procs = [subprocess.Popen(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                 for cmd in commands]
+        codes = [proc.wait() for proc in procs]
+    else:
+        codes = [subprocess.run(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL).returncode for cmd in commands]
+    elapsed = time.perf_counter() - start
+
+    stories = 0
+    for code in sources:
+        path = os.path.join(workdir, "files", code, f"{code.lower()}_stories.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stories += len(json.load(f))
+        except (OSError, ValueError):
+            pass
+    return elapsed, stories, sum(1 for c in codes if c != 0)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure end-to-end refresh throughput against the stand-in server")
+    parser.add_argument("sources", nargs="*", default=list(REFRESH_SCRIPTS), help="ET TH IE TOI")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--sequential", action="store_true", help="refresh papers one after another")
+    parser.add_argument("--base-url", help="use an already running stand-in server instead of starting one")
+    add_behaviour_args(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = make_server("127.0.0.1", 0, behaviour_from_args(args))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    env = dict(os.environ, NEWSAPP_BASE_URL=base_url)
+    workdir = tempfile.mkdtemp(prefix="newsapp-load-")
+    timings, total_stories, failures = [], 0, 0
+    try:
+        for i in range(args.rounds):
+            elapsed, stories, failed = refresh(args.sources, env, workdir, not args.sequential)
+            timings.append(elapsed)
+            total_stories += stories
+            failures += failed
+            print(f"round {i + 1}: {elapsed:.2f}s, {stories} stories, {failed} failed scripts")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if server:
+            server.shutdown()
+
+    total = sum(timings)
+    print(f"\nrefreshes: {args.rounds} x {len(args.sources)} papers "
+          f"({'sequential' if args.sequential else 'concurrent'})")
+    print(f"refresh time: median {statistics.median(timings):.2f}s, p95 {percentile(timings, 95):.2f}s")
+    print(f"throughput: {args.rounds / total:.2f} refreshes/s, {total_stories / total:.1f} stories/s")
+    if failures:
+        print(f"failed scripts: {failures}")
+    if server:
+        stats = server.stats.snapshot()
+        print(f"server: {stats['requests']} requests, {stats['bytes_sent'] / 1024:.0f} KB sent, "
+              f"{stats['requests'] / total:.1f} req/s, status {stats['by_status']}")
+
+if __name__ == "__main__":
+    main()
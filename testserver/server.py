@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+FIXTURES_DIR = os.path.join(project_root, "benchmarks", "fixtures")
+
+
+class Behaviour:
+    """Knobs for how the stand-in server misbehaves."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, bandwidth_kbps=0, error_rate=0.0,
+                 conditional=True, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bandwidth_kbps = bandwidth_kbps
+        self.error_rate = error_rate
+        self.conditional = conditional
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def fails(self):
+        with self.lock:
+            return self.error_rate > 0 and self.random.random() < self.error_rate
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.by_status = {}
+
+    def record(self, status, sent):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "bytes_sent": self.bytes_sent, "by_status": dict(self.by_status)}
+
+
+class Fixtures:
+    """Fixture pages and images keyed by their original URL (without scheme)."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        with open(os.path.join(fixtures_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.entries = {}
+        self.bodies = {}
+        for entry in manifest:
+            parts = urlsplit(entry["url"])
+            key = parts.netloc + (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            self.entries[key] = entry
+            if entry["file"] not in self.bodies:
+                with open(os.path.join(fixtures_dir, entry["file"]), "rb") as f:
+                    body = f.read()
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                self.bodies[entry["file"]] = (body, etag)
+
+    def lookup(self, path):
+        # /<host>/<path>?<query> as produced by httpclient.resolve_url
+        entry = self.entries.get(path.lstrip("/"))
+        if entry is None:
+            return None
+        body, etag = self.bodies[entry["file"]]
+        return entry["content_type"], body, etag
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NewsAppStandIn/1.0"
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.behaviour.delay())
+
+        if server.behaviour.fails():
+            return self.reply(503, b"injected failure", "text/plain")
+
+        found = server.fixtures.lookup(self.path)
+        if found is None:
+            return self.reply(404, b"not recorded", "text/plain")
+        content_type, body, etag = found
+
+        if server.behaviour.conditional and etag in self.headers.get("If-None-Match", ""):
+            return self.reply(304, b"", content_type, etag)
+        self.reply(200, body, content_type, etag)
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            # A client that stopped reading mid-body drops its kept-alive connection
+            pass
+
+    def do_HEAD(self):
+        # Headers only; the app sends these to open pooled connections early,
+        # so they wait out the same simulated latency and show up in the stats
+        server = self.server
+        time.sleep(server.behaviour.delay())
+        found = server.fixtures.lookup(self.path)
+        status, (content_type, body, _) = (200, found) if found else (404, ("text/plain", b"not recorded", None))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        server.stats.record(status, 0)
+
+    def reply(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag and self.server.behaviour.conditional:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        try:
+            self.write_throttled(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Streaming clients hang up once they have read what they need
+            self.close_connection = True
+        self.server.stats.record(status, len(body))
+
+    def write_throttled(self, body):
+        bandwidth = self.server.behaviour.bandwidth_kbps
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        # Send in 8 KB pieces, sleeping so the average rate matches the limit
+        chunk = 8192
+        for start in range(0, len(body), chunk):
+            piece = body[start:start + chunk]
+            self.wfile.write(piece)
+            time.sleep(len(piece) / (bandwidth * 1024))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8800, behaviour=None, fixtures_dir=FIXTURES_DIR, verbose=False):
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.behaviour = behaviour or Behaviour()
+    server.fixtures = Fixtures(fixtures_dir)
+    server.stats = Stats()
+    server.verbose = verbose
+    return server
+
+
+def add_behaviour_args(parser):
+    parser.add_argument("--latency", type=float, default=0, help="added latency per response, ms")
+    parser.add_argument("--jitter", type=float, default=0, help="uniform +/- jitter on the latency, ms")
+    parser.add_argument("--bandwidth", type=float, default=0, help="per-connection bandwidth, KB/s (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--no-304", action="store_true", help="ignore If-None-Match and never send ETags")
+    parser.add_argument("--seed", type=int, default=None, help="seed for jitter and injected errors")
+
+
+def behaviour_from_args(args):
+    return Behaviour(args.latency, args.jitter, args.bandwidth, args.error_rate,
+                     conditional=not args.no_304, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the four newspaper sites")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--verbose", action="store_true")
+    add_behaviour_args(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, behaviour_from_args(args), args.fixtures, args.verbose)
+    print(f"[INFO] Stand-in news server on http://{args.host}:{args.port}")
+    print(f"[INFO] Point the scrapers at it with NEWSAPP_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[INFO] {server.stats.snapshot()}")
+
+if __name__ == "__main__":
+    main()